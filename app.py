@@ -1,14 +1,34 @@
 import pandas as pd
-from flask import Flask, render_template, request, jsonify, session
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+from flask import Flask, render_template, request, jsonify, session, g, Response, has_request_context, make_response
+from markupsafe import Markup
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.decomposition import TruncatedSVD
+from scipy.sparse import csr_matrix, vstack as sparse_vstack
+import click
 import re
+import ast
 import json
 import time
 import os
-import random
-from functools import wraps
+import sys
+import hashlib
+import hmac
+import uuid
+import atexit
+import sqlite3
+from urllib.parse import urlparse
+import shutil
+import bisect
+import itertools
+from functools import wraps, lru_cache
 import logging
+import threading
+import contextvars
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 # Configure logging
@@ -19,6 +39,70 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.secret_key = 'edu-recommend-secret-key-2024'
 
+# Recommendation result cache (entries, seconds)
+app.config['RECOMMEND_CACHE_SIZE'] = int(os.environ.get('RECOMMEND_CACHE_SIZE', 1024))
+app.config['RECOMMEND_CACHE_TTL'] = float(os.environ.get('RECOMMEND_CACHE_TTL', 300))
+
+# Rendered course-card bodies kept per catalog version, course, theme and mode (0 disables)
+app.config['CARD_CACHE_SIZE'] = int(os.environ.get('CARD_CACHE_SIZE', 4096))
+
+# Course catalog CSV and its compiled index (see `flask build-index`)
+app.config['CATALOG_CSV'] = os.environ.get('CATALOG_CSV', 'Coursera_courses_catalog.csv')
+app.config['CATALOG_INDEX_DIR'] = os.environ.get('CATALOG_INDEX_DIR', 'catalog_index')
+
+# Streaming ingest (see `flask ingest`): sharded catalog directory, used instead of the
+# CSV when set, and the number of hashed term features
+app.config['CATALOG_SHARDS_DIR'] = os.environ.get('CATALOG_SHARDS_DIR', '')
+app.config['INGEST_HASH_FEATURES'] = int(os.environ.get('INGEST_HASH_FEATURES', 2**18))
+
+# Catalog hot reload: poll interval in seconds (0 = off), share of changed rows that
+# triggers a full rebuild, and the token guarding /api/admin/reload (unset = disabled)
+app.config['CATALOG_WATCH_INTERVAL'] = float(os.environ.get('CATALOG_WATCH_INTERVAL', 0))
+app.config['CATALOG_REBUILD_FRACTION'] = float(os.environ.get('CATALOG_REBUILD_FRACTION', 0.25))
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+
+# User ratings: 'sqlite' (shared by all workers on the host) or 'memory' (tests)
+app.config['RATING_STORE'] = os.environ.get('RATING_STORE', 'sqlite')
+app.config['RATING_DB_PATH'] = os.environ.get('RATING_DB_PATH', 'ratings.db')
+app.config['RATING_BATCH_SIZE'] = int(os.environ.get('RATING_BATCH_SIZE', 100))
+app.config['RATING_FLUSH_INTERVAL'] = float(os.environ.get('RATING_FLUSH_INTERVAL', 1.0))
+
+# Collaborative re-ranking from user ratings: similar courses kept per course (0 = off),
+# weight of the predicted rating against the content score, and ranked candidates re-scored
+app.config['COLLAB_NEIGHBORS'] = int(os.environ.get('COLLAB_NEIGHBORS', 20))
+app.config['COLLAB_WEIGHT'] = float(os.environ.get('COLLAB_WEIGHT', 0.2))
+app.config['COLLAB_CANDIDATES'] = int(os.environ.get('COLLAB_CANDIDATES', 50))
+
+# Seed for the synthetic ratings, review counts and enrollment shown where the CSV has none
+app.config['RATING_SEED'] = int(os.environ.get('RATING_SEED', 2024))
+
+# Scoring engine: 'tfidf' (exact terms, sparse) or 'lsa' (latent semantic, dense)
+app.config['RECOMMENDER_ENGINE'] = os.environ.get('RECOMMENDER_ENGINE', 'tfidf')
+app.config['LSA_DIMENSIONS'] = int(os.environ.get('LSA_DIMENSIONS', 192))
+
+# Batch recommendation API: queries per request, and score-matrix cells (courses x
+# queries) computed per block, which bounds the memory of one batch
+app.config['BATCH_MAX_QUERIES'] = int(os.environ.get('BATCH_MAX_QUERIES', 5000))
+app.config['BATCH_SCORE_CELLS'] = int(os.environ.get('BATCH_SCORE_CELLS', 4_000_000))
+
+# Similar courses: neighbours precomputed per course (0 = off), score-matrix cells per
+# block while computing them, and worker processes (0 = compute in-process)
+app.config['SIMILAR_COURSES_K'] = int(os.environ.get('SIMILAR_COURSES_K', 10))
+app.config['SIMILAR_BLOCK_CELLS'] = int(os.environ.get('SIMILAR_BLOCK_CELLS', 4_000_000))
+app.config['SIMILAR_WORKERS'] = int(os.environ.get('SIMILAR_WORKERS', 0))
+
+# Scoring concurrency: worker threads (0 = score on the request thread), tasks allowed to
+# run or wait before new requests get 503 (keep it below gunicorn's --threads, so requests
+# beyond it are turned away instead of queueing in the server), seconds to wait for a
+# result, Retry-After value
+app.config['SCORING_WORKERS'] = int(os.environ.get('SCORING_WORKERS', min(4, os.cpu_count() or 1)))
+app.config['SCORING_QUEUE_LIMIT'] = int(os.environ.get('SCORING_QUEUE_LIMIT', 8))
+app.config['SCORING_TIMEOUT'] = float(os.environ.get('SCORING_TIMEOUT', 10))
+app.config['SCORING_RETRY_AFTER'] = int(os.environ.get('SCORING_RETRY_AFTER', 1))
+
+# Seconds to hold /recommend so the UI loading animation is visible (0 = off)
+app.config['LOADING_ANIMATION_DELAY'] = float(os.environ.get('LOADING_ANIMATION_DELAY', 0))
+
 # Theme configurations 
 THEMES = {
     'default': {'name': 'Ocean Blue', 'primary': '#6366f1', 'secondary': '#10b981', 'accent': '#f59e0b', 'background': '#0f172a', 'surface': '#1e293b'},
@@ -30,25 +114,70 @@ THEMES = {
 }
 
 #  sample data with realistic ratings and reviews
-def generate_realistic_ratings():
-    """Generate realistic rating distributions for courses"""
-    return {
-        'rating': round(random.uniform(3.8, 4.9), 1),
-        'reviews': random.randint(500, 50000),
-        'stars': {
-            '5': random.randint(40, 85),
-            '4': random.randint(15, 40),
-            '3': random.randint(5, 20),
-            '2': random.randint(1, 10),
-            '1': random.randint(0, 5)
-        }
-    }
+# Inclusive ranges and storage types of the synthetic per-course statistics
+SYNTHETIC_STATS = {
+    'reviews': (500, 50000, np.int32),
+    'enrollment': (10000, 200000, np.int32),
+    'stars_5': (40, 85, np.int16),
+    'stars_4': (15, 40, np.int16),
+    'stars_3': (5, 20, np.int16),
+    'stars_2': (1, 10, np.int16),
+    'stars_1': (0, 5, np.int16)
+}
+STAR_COLUMNS = ['stars_5', 'stars_4', 'stars_3', 'stars_2', 'stars_1']
+
+def splitmix64(x):
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def course_uniforms(links, streams, seed):
+    """Uniform [0, 1) draws per course and stream, a pure function of the course link and seed.
+
+    Unlike a sequential RNG this does not depend on row order, so a course
+    keeps its values when other rows are added or removed.
+    """
+    base = pd.util.hash_array(np.asarray(links, dtype=object), hash_key=f"{seed % 10 ** 16:016d}")
+    draws = splitmix64(base[:, None] + np.arange(streams, dtype=np.uint64)[None, :])
+    return (draws >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+def parse_course_rating(values):
+    """Numeric rating from strings like ``4.2stars``; NaN for ``not-mentioned`` and other values"""
+    rating = pd.to_numeric(values.astype(str).str.extract(r"^\s*(\d+(?:\.\d+)?)\s*stars?", expand=False), errors='coerce')
+    return rating.where((rating >= 0) & (rating <= 5))
+
+def add_course_stats(data):
+    """Add rating, reviews, enrollment and star-count columns in one vectorized pass.
+
+    The CSV's own ``course_rating`` is used where it has a value; everything
+    else is synthesized deterministically from the course link and RATING_SEED.
+    """
+    draws = course_uniforms(data['course_link'], 1 + len(SYNTHETIC_STATS), app.config['RATING_SEED'])
+    if 'rating' not in data.columns:
+        rating = np.round(3.8 + draws[:, 0] * 1.1, 1)
+        if 'course_rating' in data.columns:
+            real = parse_course_rating(data['course_rating']).to_numpy()
+            rating = np.where(np.isnan(real), rating, real)
+        data['rating'] = rating.astype(np.float32)
+    for stream, (col, (low, high, dtype)) in enumerate(SYNTHETIC_STATS.items(), start=1):
+        if col not in data.columns:
+            data[col] = (low + np.floor(draws[:, stream] * (high - low + 1))).astype(dtype)
+    return data
+
+def rating_breakdown(course):
+    """Star counts, their percentages and total for one result row"""
+    stars = {col[-1]: int(course[col]) for col in STAR_COLUMNS}
+    total_reviews = sum(stars.values())
+    rating_percentages = {k: round((v / total_reviews) * 100, 1) if total_reviews else 0.0 for k, v in stars.items()}
+    return stars, rating_percentages, total_reviews
 
 # Load dataset with  rating system
-try:
-    data = pd.read_csv('Coursera_courses_catalog.csv')
-    logger.info("Dataset loaded successfully")
-    
+def load_catalog_csv(path):
+    return clean_catalog(pd.read_csv(path))
+
+def clean_catalog(data):
+    """Validate and clean raw catalog rows; shared by the CSV loader and the streaming ingest"""
     required_columns = ['course_name', 'category', 'course_skills', 'course_link', 'time_required']
     for col in required_columns:
         if col not in data.columns:
@@ -57,18 +186,15 @@ try:
     data = data.dropna(subset=['course_name', 'course_link'])
     data['category'] = data['category'].fillna('General')
     data['course_skills'] = data['course_skills'].fillna('[]')
+    # Fingerprint of each row's source fields (not the exported row number), used to detect changed courses on reload
+    source_columns = [col for col in data.columns if not col.startswith('Unnamed:')]
+    data['row_hash'] = pd.util.hash_pandas_object(data[source_columns], index=False).to_numpy()
     
     # Add rating columns 
-    if 'rating' not in data.columns:
-        data['rating'] = [generate_realistic_ratings()['rating'] for _ in range(len(data))]
-    if 'reviews' not in data.columns:
-        data['reviews'] = [generate_realistic_ratings()['reviews'] for _ in range(len(data))]
-    if 'enrollment' not in data.columns:
-        data['enrollment'] = [random.randint(10000, 200000) for _ in range(len(data))]
-        
-except Exception as e:
-    logger.error(f"Error loading dataset: {e}")
-    # Create comprehensive sample data with realistic ratings
+    return add_course_stats(data)
+
+def sample_catalog():
+    """Comprehensive sample data with realistic ratings, used when the CSV cannot be loaded"""
     sample_courses = []
     course_templates = [
         {
@@ -154,21 +280,16 @@ except Exception as e:
     ]
     
     for template in course_templates:
-        ratings_data = generate_realistic_ratings()
         sample_courses.append({
             'course_name': template['name'],
             'category': template['category'],
             'course_skills': template['skills'],
             'course_link': template['link'],
             'time_required': template['time'],
-            'difficulty': template['difficulty'],
-            'rating': ratings_data['rating'],
-            'reviews': ratings_data['reviews'],
-            'enrollment': random.randint(10000, 200000),
-            'stars_distribution': ratings_data['stars']
+            'difficulty': template['difficulty']
         })
     
-    data = pd.DataFrame(sample_courses)
+    return add_course_stats(pd.DataFrame(sample_courses))
 
 # Predefined options 
 predefined_categories = ["Data Science", "Business", "Health", "Arts and Humanities", "Computer Science", "Social Sciences", "Engineering", "Mathematics", "Personal Development", "Language Learning", "Artificial Intelligence", "Marketing", "Finance"]
@@ -177,28 +298,459 @@ predefined_difficulties = ["Beginner", "Intermediate", "Advanced", "Mixed"]
 predefined_languages = ["English", "Spanish", "French", "German", "Chinese", "Portuguese", "Italian", "Japanese"]
 predefined_subtitles = ["English", "Spanish", "French", "Portuguese", "German", "Chinese", "Arabic"]
 predefined_durations = ["1-3 hours", "4-6 hours", "7-10 hours", "11-15 hours", "16+ hours"]
+# Facet selects of the search form, whose options /api/facets counts
+FACET_OPTIONS = {'category': predefined_categories, 'difficulty': predefined_difficulties,
+                 'language': predefined_languages, 'subtitles': predefined_subtitles}
 
 # User rating storage 
-user_ratings = {}
+def empty_aggregate():
+    return {'count': 0, 'sum': 0, 'histogram': {str(stars): 0 for stars in range(1, 6)}}
+
+def summarize_aggregate(count, total, histogram):
+    return {
+        'count': count,
+        'average': round(total / count, 2) if count else None,
+        'histogram': histogram
+    }
+
+class MemoryRatingStore:
+    """In-process rating backend for tests and single-worker development"""
+
+    def __init__(self):
+        self._ratings = {}
+        self._aggregates = {}
+        self._rating_versions = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def add_rating(self, user_id, course_id, rating):
+        with self._lock:
+            previous = self._ratings.get((user_id, course_id))
+            self._ratings[(user_id, course_id)] = rating
+            aggregate = self._aggregates.setdefault(course_id, empty_aggregate())
+            if previous is None:
+                aggregate['count'] += 1
+            else:
+                aggregate['sum'] -= previous
+                aggregate['histogram'][str(previous)] -= 1
+            aggregate['sum'] += rating
+            aggregate['histogram'][str(rating)] += 1
+            self._version += 1
+            self._rating_versions[(user_id, course_id)] = self._version
+
+    def get_user_rating(self, user_id, course_id):
+        return self._ratings.get((user_id, course_id))
+
+    def get_aggregates(self, course_ids):
+        with self._lock:
+            result = {}
+            for key in course_ids:
+                aggregate = self._aggregates.get(key, empty_aggregate())
+                result[key] = summarize_aggregate(aggregate['count'], aggregate['sum'], dict(aggregate['histogram']))
+            return result
+
+    def version(self):
+        """Changes whenever any aggregate does; part of the ETags of pages showing them"""
+        with self._lock:
+            return self._version
+
+    def ratings_since(self, version):
+        with self._lock:
+            return self._version, [(user_id, course_id, rating) for (user_id, course_id), rating in self._ratings.items()
+                                   if self._rating_versions[(user_id, course_id)] > version]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class SQLiteRatingStore:
+    """Rating backend shared by all workers on a host through one SQLite file in WAL mode.
+
+    Writes are buffered and committed in batches, each batch updating the
+    ratings table and the per-course count/sum/histogram aggregates in one
+    transaction. A user's own pending ratings are visible immediately;
+    aggregates lag by at most ``flush_interval`` seconds.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS ratings (
+            user_id TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+            updated_at REAL NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, course_id)
+        );
+        CREATE TABLE IF NOT EXISTS course_rating_aggregates (
+            course_id TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0,
+            sum INTEGER NOT NULL DEFAULT 0,
+            stars_1 INTEGER NOT NULL DEFAULT 0,
+            stars_2 INTEGER NOT NULL DEFAULT 0,
+            stars_3 INTEGER NOT NULL DEFAULT 0,
+            stars_4 INTEGER NOT NULL DEFAULT 0,
+            stars_5 INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS rating_version (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO rating_version (id, version) VALUES (0, 0);
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        if 'version' not in {column[1] for column in self._conn.execute("PRAGMA table_info(ratings)")}:
+            # Databases from before workers synced ratings by version
+            self._conn.execute("ALTER TABLE ratings ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ratings_by_version ON ratings (version)")
+        self._closed = threading.Event()
+        if flush_interval > 0:
+            threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True, name='rating-flusher').start()
+
+    def add_rating(self, user_id, course_id, rating):
+        with self._lock:
+            self._pending[(user_id, course_id)] = (rating, time.time())
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def get_user_rating(self, user_id, course_id):
+        with self._lock:
+            pending = self._pending.get((user_id, course_id))
+        if pending is not None:
+            return pending[0]
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT rating FROM ratings WHERE user_id = ? AND course_id = ?", (user_id, course_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_aggregates(self, course_ids):
+        course_ids = list(course_ids)
+        result = {key: summarize_aggregate(0, 0, empty_aggregate()['histogram']) for key in course_ids}
+        if not course_ids:
+            return result
+        placeholders = ','.join('?' * len(course_ids))
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT course_id, count, sum, stars_1, stars_2, stars_3, stars_4, stars_5 "
+                f"FROM course_rating_aggregates WHERE course_id IN ({placeholders})", course_ids
+            ).fetchall()
+        for key, count, total, *stars in rows:
+            result[key] = summarize_aggregate(count, total, {str(i + 1): n for i, n in enumerate(stars)})
+        return result
+
+    def version(self):
+        """Counter bumped by every committed batch, shared by all workers through the database"""
+        with self._db_lock:
+            return self._conn.execute("SELECT version FROM rating_version WHERE id = 0").fetchone()[0]
+
+    def ratings_since(self, version):
+        """The store's version and every committed (user, course, rating) written after ``version``"""
+        with self._db_lock:
+            # One read transaction, so the rows are exactly those up to the version returned
+            self._conn.execute("BEGIN")
+            try:
+                current = self._conn.execute("SELECT version FROM rating_version WHERE id = 0").fetchone()[0]
+                rows = self._conn.execute(
+                    "SELECT user_id, course_id, rating FROM ratings WHERE version > ? AND version <= ?", (version, current)
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        return current, rows
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        with self._db_lock:
+            try:
+                # IMMEDIATE takes the write lock up front so concurrent workers serialise cleanly
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("UPDATE rating_version SET version = version + 1 WHERE id = 0")
+                version = self._conn.execute("SELECT version FROM rating_version WHERE id = 0").fetchone()[0]
+                for (user_id, course_id), (rating, updated_at) in batch.items():
+                    row = self._conn.execute(
+                        "SELECT rating FROM ratings WHERE user_id = ? AND course_id = ?", (user_id, course_id)
+                    ).fetchone()
+                    previous = row[0] if row else None
+                    if previous == rating:
+                        continue
+                    self._conn.execute(
+                        "INSERT INTO ratings (user_id, course_id, rating, updated_at, version) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (user_id, course_id) DO UPDATE SET rating = excluded.rating, "
+                        "updated_at = excluded.updated_at, version = excluded.version",
+                        (user_id, course_id, rating, updated_at, version)
+                    )
+                    deltas = [0] * 5
+                    deltas[rating - 1] += 1
+                    if previous is not None:
+                        deltas[previous - 1] -= 1
+                    self._conn.execute(
+                        "INSERT INTO course_rating_aggregates (course_id, count, sum, stars_1, stars_2, stars_3, stars_4, stars_5) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (course_id) DO UPDATE SET "
+                        "count = count + excluded.count, sum = sum + excluded.sum, "
+                        "stars_1 = stars_1 + excluded.stars_1, stars_2 = stars_2 + excluded.stars_2, "
+                        "stars_3 = stars_3 + excluded.stars_3, stars_4 = stars_4 + excluded.stars_4, "
+                        "stars_5 = stars_5 + excluded.stars_5",
+                        (course_id, 1 if previous is None else 0, rating - (previous or 0), *deltas)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                with self._lock:
+                    # Keep the batch for the next flush unless newer ratings replaced it
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                # BEGIN itself fails when another worker holds the write lock past the timeout
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def _flush_periodically(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing ratings: {e}")
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+def create_rating_store():
+    backend = app.config['RATING_STORE']
+    if backend == 'memory':
+        return MemoryRatingStore()
+    if backend == 'sqlite':
+        return SQLiteRatingStore(app.config['RATING_DB_PATH'], app.config['RATING_BATCH_SIZE'], app.config['RATING_FLUSH_INTERVAL'])
+    raise ValueError(f"Unknown RATING_STORE: {backend}")
+
+rating_store = create_rating_store()
+atexit.register(rating_store.close)
+
+def neighbor_order(pair):
+    """Most similar first, ties by course id"""
+    return -pair[0], pair[1]
+
+class CoRatingIndex:
+    """Item-item similarity from user ratings, maintained one rating at a time.
+
+    Ratings are centred on 3 stars (5 stars counts +2, 1 star -2). The sparse
+    co-rating matrix holds, for every pair of courses rated by a common user,
+    the sum of those users' products of centred ratings; with each course's
+    squared norm this is their cosine similarity. Rows are dicts so a rating
+    updates them in place: a new or changed rating touches only the entries
+    between its course and the other courses its user rated. Every course
+    keeps its ``k`` most similar courses (positive similarity only), which is
+    all a recommendation request reads.
+
+    Each worker keeps its own index and ``sync`` brings it up to date with the
+    shared rating store, applying only the rows written since the store
+    version it last saw. Two workers at the same ``version`` therefore hold
+    the same index.
+    """
+
+    def __init__(self, k=20):
+        self.k = k
+        # Rows of databases older than the version column carry version 0
+        self.version = -1
+        self._users = defaultdict(dict)
+        self._rows = defaultdict(dict)
+        self._norms = defaultdict(float)
+        self._neighbors = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def sync(self, store):
+        """Apply the ratings committed to ``store`` since the last sync; returns the store version now reflected"""
+        if self.k <= 0:
+            return store.version()
+        with self._sync_lock:
+            version, rows = store.ratings_since(self.version)
+            for user_id, course_id, rating in rows:
+                self.add(user_id, course_id, rating)
+            self.version = version
+            return version
+
+    def add(self, user_id, course_id, rating):
+        if self.k <= 0:
+            return
+        value = rating - 3
+        with self._lock:
+            ratings = self._users[user_id]
+            previous = ratings.get(course_id)
+            if previous == value:
+                return
+            ratings[course_id] = value
+            delta = value - (previous or 0)
+            if not delta:
+                return
+            self._norms[course_id] += value ** 2 - (previous or 0) ** 2
+            row = self._rows[course_id]
+            for other, other_value in ratings.items():
+                if other != course_id and other_value:
+                    row[other] = row.get(other, 0) + delta * other_value
+                    self._rows[other][course_id] = row[other]
+            # The changed norm moves every similarity in this course's row, so its
+            # own list is rebuilt and each co-rated course re-checks it as a neighbour
+            self._neighbors[course_id] = self._top_k(course_id)
+            for other in row:
+                self._offer(other, course_id)
+
+    def _similarity(self, course_id, other):
+        norms = self._norms[course_id] * self._norms[other]
+        return self._rows[course_id].get(other, 0) / norms ** 0.5 if norms > 0 else 0.0
+
+    def _top_k(self, course_id):
+        similarities = ((self._similarity(course_id, other), other) for other in self._rows[course_id])
+        return sorted((pair for pair in similarities if pair[0] > 0), key=neighbor_order)[:self.k]
+
+    def _offer(self, course_id, candidate):
+        """Update ``course_id``'s neighbour list after its similarity to ``candidate`` changed"""
+        neighbors = self._neighbors.get(course_id, [])
+        similarity = self._similarity(course_id, candidate)
+        current = next((old for old, other in neighbors if other == candidate), None)
+        if current is not None and similarity < current:
+            # A course outside the list may now beat it
+            self._neighbors[course_id] = self._top_k(course_id)
+            return
+        neighbors = [pair for pair in neighbors if pair[1] != candidate]
+        if similarity > 0:
+            bisect.insort(neighbors, (similarity, candidate), key=neighbor_order)
+        self._neighbors[course_id] = neighbors[:self.k]
+
+    def neighbors(self, course_id):
+        with self._lock:
+            return [(other, similarity) for similarity, other in self._neighbors.get(course_id, [])]
+
+    def predict(self, user_id, positions_by_id):
+        """Predicted centred rating (-2..2) of the courses near ``user_id``'s rated ones.
+
+        Returns sorted row positions and their predictions (the similarity-weighted
+        mean of the user's ratings of their neighbours), or None for users without
+        any rating away from 3 stars.
+        """
+        with self._lock:
+            ratings = self._users.get(user_id)
+            if not ratings:
+                return None
+            entries = [(positions_by_id.get(other, -1), similarity, value)
+                       for course_id, value in ratings.items() if value
+                       for similarity, other in self._neighbors.get(course_id, ())]
+        if not entries:
+            return None
+        positions, similarities, values = (np.array(column) for column in zip(*entries))
+        known = positions >= 0
+        if not known.any():
+            return None
+        courses, slots = np.unique(positions[known], return_inverse=True)
+        weights = np.bincount(slots, weights=similarities[known], minlength=len(courses))
+        totals = np.bincount(slots, weights=similarities[known] * values[known], minlength=len(courses))
+        return courses, totals / weights
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'courses': len(self._norms),
+                'pairs': sum(len(row) for row in self._rows.values()) // 2,
+                'neighbors': self.k,
+                'version': self.version
+            }
+
+co_ratings = CoRatingIndex(app.config['COLLAB_NEIGHBORS'])
+co_ratings.sync(rating_store)
+
+# Instrumentation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class LatencyHistogram:
+    """Cumulative latency histogram in the Prometheus bucket layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = list(itertools.accumulate(self.counts))
+            return list(zip(self.buckets + (float('inf'),), cumulative)), self.sum, self.count
+
+stage_latency = defaultdict(LatencyHistogram)
+request_latency = defaultdict(LatencyHistogram)
+
+@contextmanager
+def timed_stage(name):
+    """Time a pipeline stage into its histogram and the current request's Server-Timing header"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_latency[name].observe(elapsed)
+        if has_request_context():
+            g.setdefault('stage_timings', []).append((name, elapsed))
 
 # Helper functions
 def add_loading_animation(func):
+    """Optional artificial delay for the UI loading animation, off unless LOADING_ANIMATION_DELAY is set"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        time.sleep(0.5)
+        delay = app.config['LOADING_ANIMATION_DELAY']
+        if delay > 0:
+            with timed_stage('animation'):
+                time.sleep(delay)
         return func(*args, **kwargs)
     return wrapper
 
+WORD_NUMBERS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6}
+HOUR_UNITS = r"(?:hours?|hrs?|horas?|heures?|stunden)"
+MINUTE_UNITS = r"(?:minutes?|mins?|minutos?)"
+
 def convert_time_to_hours(time_str):
     if pd.isna(time_str):
         return (0, 0)
-    time_str = str(time_str).lower()
-    match_range = re.match(r"(\d+)-(\d+)\s*hours?", time_str)
+    time_str = str(time_str).lower().strip()
+    time_str = re.sub(r"\b(" + "|".join(WORD_NUMBERS) + r")\b", lambda m: str(WORD_NUMBERS[m.group(1)]), time_str)
+    # "Approx. 14 hours to complete"
+    time_str = re.sub(r"^approx\.?\s*", "", time_str)
+    match_range = re.match(r"(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)\s*" + HOUR_UNITS, time_str)
     if match_range:
-        return (int(match_range.group(1)), int(match_range.group(2)))
-    match_single = re.match(r"(\d+)\s*hours?", time_str)
-    if match_single:
-        value = int(match_single.group(1))
+        return (float(match_range.group(1)), float(match_range.group(2)))
+    match_open = re.match(r"(\d+(?:\.\d+)?)\s*\+\s*" + HOUR_UNITS, time_str)
+    if match_open:
+        return (float(match_open.group(1)), float('inf'))
+    match_hours = re.search(r"(\d+(?:\.\d+)?)\s*" + HOUR_UNITS, time_str)
+    match_minutes = re.search(r"(\d+)\s*" + MINUTE_UNITS, time_str)
+    if match_hours or match_minutes:
+        value = float(match_hours.group(1)) if match_hours else 0.0
+        if match_minutes:
+            value += int(match_minutes.group(1)) / 60
+        value = round(value, 2)
         return (value, value)
     match_weeks = re.match(r"(\d+)\s*weeks?", time_str)
     if match_weeks:
@@ -206,105 +758,1668 @@ def convert_time_to_hours(time_str):
         return (weeks * 5, weeks * 10)
     return (0, 0)
 
-def filter_courses_by_time(data, user_time):
-    if not user_time or user_time == "Any":
-        return data
+def course_slug(link):
+    """Last path segment of a course URL, e.g. ``machine-learning`` for ``.../learn/machine-learning``"""
+    path = urlparse(str(link).strip()).path.rstrip('/')
+    return path.rsplit('/', 1)[-1] or str(link).strip()
+
+def normalize_level(level):
+    if pd.isna(level):
+        return 'Not specified'
+    level = str(level).strip().lower()
+    for name in ['Beginner', 'Intermediate', 'Advanced', 'Mixed']:
+        if level.startswith(name.lower()):
+            return name
+    return 'Not specified'
+
+def parse_subtitles(subtitles, level):
+    """Comma-separated subtitle languages of a course.
+
+    Guided projects in the CSV have their columns shifted: the
+    "Subtitles: ..." text sits in ``course_level`` while ``course_subtitles``
+    holds the course language, so the prefixed text wins wherever it is.
+    """
+    for value in (subtitles, level):
+        if isinstance(value, str) and value.strip().startswith('Subtitles:'):
+            return ', '.join(lang.strip() for lang in value.split(':', 1)[1].split(',') if lang.strip())
+    if isinstance(subtitles, str) and subtitles.strip() and subtitles.strip() != 'not-mentioned':
+        return ', '.join(lang.strip() for lang in subtitles.split(',') if lang.strip())
+    return ''
+
+def parse_skills(value):
+    if isinstance(value, (list, tuple)):
+        return [str(skill) for skill in value]
+    if not isinstance(value, str) or not value.startswith('['):
+        return []
+    try:
+        skills = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return [str(skill) for skill in skills] if isinstance(skills, (list, tuple)) else []
+
+CATEGORICAL_COLUMNS = ['category', 'sub_category', 'difficulty', 'course_language']
+
+def prepare_filter_columns(data):
+    """Parse the filterable fields once at load time.
+
+    Durations become numeric ``duration_min_hours``/``duration_max_hours``
+    columns (NaN when unknown), subtitles a normalised ``subtitle_languages``
+    list, and category, sub-category, level and language become pandas
+    categoricals so filters compare integer codes.
+    """
+    durations = {value: convert_time_to_hours(value) for value in data['time_required'].unique()}
+    parsed = data['time_required'].map(durations)
+    data['duration_min_hours'] = parsed.map(lambda d: d[0] if d != (0, 0) else np.nan).astype('float32')
+    data['duration_max_hours'] = parsed.map(lambda d: d[1] if d != (0, 0) else np.nan).astype('float32')
+
+    level_source = 'course_level' if 'course_level' in data.columns else 'difficulty'
+    if level_source in data.columns:
+        data['difficulty'] = data[level_source].map(normalize_level)
+    else:
+        data['difficulty'] = 'Not specified'
+    if 'course_language' not in data.columns:
+        data['course_language'] = 'not-mentioned'
+    if 'sub_category' not in data.columns:
+        data['sub_category'] = data['category']
+    data['sub_category'] = data['sub_category'].fillna('General')
+    data['course_language'] = data['course_language'].fillna('not-mentioned')
+    subtitles = data['course_subtitles'] if 'course_subtitles' in data.columns else pd.Series(np.nan, index=data.index)
+    levels = data['course_level'] if 'course_level' in data.columns else pd.Series(np.nan, index=data.index)
+    data['subtitle_languages'] = [parse_subtitles(sub, level) for sub, level in zip(subtitles.tolist(), levels.tolist())]
+    # Stable id for per-course endpoints and state such as ratings
+    data['course_id'] = data['course_link'].map(course_slug)
+
+    for col in CATEGORICAL_COLUMNS:
+        data[col] = data[col].astype('category')
+    return data
+
+# Facet name -> prepared column; 'subtitles' holds comma-separated languages
+FACET_COLUMNS = {
+    'category': 'category',
+    'sub_category': 'sub_category',
+    'difficulty': 'difficulty',
+    'language': 'course_language',
+    'subtitles': 'subtitle_languages'
+}
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+class FacetIndex:
+    """One packed bitset (a bit per course) for every value of every facet.
+
+    A filter selects the OR of the bitsets of the values containing it
+    (case-insensitive, like the old substring filters) and filters combine
+    with bitwise AND. ``counts`` pops the bits of each value against the
+    other facets' selection, which is how many courses the value would add.
+    """
+
+    def __init__(self, size, values, bitsets):
+        self.size = size
+        self.values = values
+        self.bitsets = bitsets
+
+    @classmethod
+    def build(cls, data):
+        values, bitsets = {}, {}
+        for facet, column in FACET_COLUMNS.items():
+            if facet == 'subtitles':
+                lists = [value.split(', ') if value else [] for value in data[column].tolist()]
+                names = sorted({lang for langs in lists for lang in langs})
+                codes = {name: code for code, name in enumerate(names)}
+                bits = np.zeros((len(names), len(data)), dtype=bool)
+                for position, langs in enumerate(lists):
+                    bits[[codes[lang] for lang in langs], position] = True
+                packed = np.packbits(bits, axis=1)
+            else:
+                column_codes = data[column].cat.codes.to_numpy()
+                names = [str(category) for category in data[column].cat.categories]
+                packed = np.stack([np.packbits(column_codes == code) for code in range(len(names))]) if names else np.zeros((0, (len(data) + 7) // 8), dtype=np.uint8)
+            values[facet] = names
+            bitsets[facet] = packed
+        return cls(len(data), values, bitsets)
+
+    def select(self, facet, value):
+        """Bitset of the courses whose ``facet`` value contains ``value``"""
+        value = str(value).lower()
+        rows = [row for row, name in enumerate(self.values[facet]) if value in name.lower()]
+        if not rows:
+            return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitsets[facet][rows], axis=0)
+
+    def combine(self, selection, extra=None, skip=None):
+        """AND of the selected facets (except ``skip``) and an optional boolean mask"""
+        bits = np.packbits(extra) if extra is not None else np.packbits(np.ones(self.size, dtype=bool))
+        for facet, value in selection.items():
+            if facet != skip and value and value != 'Any':
+                bits &= self.select(facet, value)
+        return bits
+
+    def mask(self, selection, extra=None):
+        return np.unpackbits(self.combine(selection, extra), count=self.size).astype(bool)
+
+    def counts(self, selection, extra=None):
+        """Matches per value of every facet, each under the other facets' filters"""
+        counts = {}
+        for facet, bitsets in self.bitsets.items():
+            base = self.combine(selection, extra, skip=facet)
+            totals = POPCOUNT[bitsets & base].sum(axis=1, dtype=np.int64)
+            counts[facet] = {name: int(total) for name, total in zip(self.values[facet], totals) if total}
+        return counts
+
+    def option_counts(self, options, selection, extra=None):
+        """Matches per form option, each under the other facets' filters.
+
+        An option can cover several values (``Chinese`` both scripts) and a course
+        several subtitle values, so each option pops the OR of its values' bitsets,
+        exactly what selecting it filters on, rather than adding up value counts.
+        """
+        counts = {}
+        for facet, names in options.items():
+            base = self.combine(selection, extra, skip=facet)
+            counts[facet] = {name: int(POPCOUNT[self.select(facet, name) & base].sum()) for name in names}
+        return counts
+
+def duration_mask(data, user_time):
     min_time, max_time = convert_time_to_hours(user_time)
     if min_time == 0 and max_time == 0:
-        return data
-    def time_within_range(time_str):
-        course_min_time, course_max_time = convert_time_to_hours(time_str)
-        return (course_max_time >= min_time) and (course_min_time <= max_time)
-    return data[data['time_required'].apply(time_within_range)]
+        return np.ones(len(data), dtype=bool)
+    return ((data['duration_max_hours'] >= min_time) & (data['duration_min_hours'] <= max_time)).to_numpy()
 
-@add_loading_animation
-def filter_courses_by_preferences(data, user_input):
+def filter_courses_by_preferences(data, user_input, index=None, facets=None):
+    return data[preference_mask(data, user_input, index, facets)]
+
+def preference_mask(data, user_input, index=None, facets=None):
+    """Boolean mask of the rows of ``data`` matching the query's filters"""
     user_topic, user_skills, user_category, user_difficulty, user_language, user_time, user_subtitles = user_input
-    filtered_data = data.copy()
-    if user_category and user_category != "Any":
-        filtered_data = filtered_data[filtered_data['category'].str.contains(user_category, case=False, na=False)]
-    filtered_data = filter_courses_by_time(filtered_data, user_time)
+    index = index or current_catalog().index
+    facets = facets or current_catalog().facets
+    selection = {'category': user_category, 'difficulty': user_difficulty, 'language': user_language, 'subtitles': user_subtitles}
+    mask = facets.mask(selection)[data.index.to_numpy()]
+    if user_time and user_time != "Any":
+        mask &= duration_mask(data, user_time)
     if user_skills and user_skills != "Any":
-        filtered_data = filtered_data[
-            filtered_data['course_skills'].apply(
-                lambda x: user_skills.lower() in str(x).lower() if pd.notna(x) else False
-            )
-        ]
-    if user_difficulty and user_difficulty != "Any" and 'difficulty' in filtered_data.columns:
-        filtered_data = filtered_data[filtered_data['difficulty'].str.contains(user_difficulty, case=False, na=False)]
-    return filtered_data
+        mask &= index.skill_mask(user_skills)[data.index.to_numpy()]
+    return mask
 
-vectorizer = TfidfVectorizer(stop_words='english', max_features=5000, ngram_range=(1, 2))
+def build_course_features(data, skills):
+    """Combine name, category and skills into the text the TF-IDF index is fitted on"""
+    return (
+        data['course_name'] + " " +
+        data['category'].astype(str) + " " +
+        pd.Series(skills.joined(), index=data.index)
+    )
 
-@add_loading_animation
-def recommend_courses(user_input, filtered_courses, top_n=8):
-    if filtered_courses.empty:
-        return []
+class SkillTable:
+    """Interned, array-backed skill lists parsed once per catalog load.
+
+    ``vocab`` holds each distinct skill once; the skills of the course at row
+    position ``i`` are ``vocab[ids[offsets[i]:offsets[i + 1]]]``.
+    """
+
+    def __init__(self, vocab, ids, offsets):
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def parse(cls, course_skills):
+        return cls.from_lists([parse_skills(value) for value in course_skills])
+
+    @classmethod
+    def from_lists(cls, skill_lists):
+        vocab = []
+        vocab_ids = {}
+        counts = np.zeros(len(skill_lists), dtype=np.int64)
+        ids = []
+        for position, skills in enumerate(skill_lists):
+            for skill in skills:
+                skill = sys.intern(skill.strip())
+                key = skill.lower()
+                if key not in vocab_ids:
+                    vocab_ids[key] = len(vocab)
+                    vocab.append(skill)
+                ids.append(vocab_ids[key])
+            counts[position] = len(skills)
+        offsets = np.zeros(len(skill_lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(vocab, np.array(ids, dtype=np.int32), offsets)
+
+    @classmethod
+    def concat(cls, tables):
+        """One table for the rows of several tables, merging their vocabularies"""
+        vocab = []
+        vocab_ids = {}
+        ids = []
+        offsets = [np.zeros(1, dtype=np.int64)]
+        for table in tables:
+            remap = np.empty(len(table.vocab), dtype=np.int32)
+            for local_id, skill in enumerate(table.vocab):
+                key = skill.lower()
+                if key not in vocab_ids:
+                    vocab_ids[key] = len(vocab)
+                    vocab.append(skill)
+                remap[local_id] = vocab_ids[key]
+            ids.append(remap[np.asarray(table.ids)])
+            offsets.append(np.asarray(table.offsets[1:]) + offsets[-1][-1])
+        return cls(vocab, np.concatenate(ids) if ids else np.empty(0, dtype=np.int32), np.concatenate(offsets))
+
+    def skills_for(self, position):
+        return [self.vocab[i] for i in self.ids[self.offsets[position]:self.offsets[position + 1]]]
+
+    def joined(self):
+        """Space-joined skills per course, used as TF-IDF input"""
+        return [' '.join(self.skills_for(position)) for position in range(len(self.offsets) - 1)]
+
+    def postings(self):
+        """Inverted index from normalised skill name to the row positions that list it"""
+        rows = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32), np.diff(self.offsets))
+        order = np.argsort(self.ids, kind='stable')
+        boundaries = np.flatnonzero(np.diff(self.ids[order])) + 1
+        return {
+            self.vocab[self.ids[group[0]]].lower(): rows[group]
+            for group in np.split(order, boundaries) if len(group)
+        }
+
+TFIDF_PARAMS = {'stop_words': 'english', 'max_features': 5000, 'ngram_range': (1, 2)}
+
+class CourseIndex:
+    """TF-IDF index fitted once over the full catalog.
+
+    Rows of ``matrix`` line up with row positions in ``data``; filtering
+    selects rows of the precomputed matrix so each query only costs one
+    ``transform`` and a sparse dot product.
+    """
+
+    def __init__(self, vectorizer, matrix, has_features, skills, embedding=None, neighbors=None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.has_features = has_features
+        self.skills = skills
+        # Set when the LSA engine is active; queries are then scored in the dense space
+        self.embedding = embedding
+        # Precomputed similar-courses table (None when SIMILAR_COURSES_K is 0)
+        self.neighbors = neighbors
+        self.skill_postings = skills.postings()
+        self._skill_mask = lru_cache(maxsize=256)(self._build_skill_mask)
+
+    @classmethod
+    def build(cls, data):
+        skills = SkillTable.parse(data['course_skills'])
+        features = build_course_features(data, skills)
+        vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
+        matrix = vectorizer.fit_transform(features).tocsr()
+        return cls(vectorizer, matrix, features.str.strip().astype(bool).to_numpy(), skills)
+
+    def skill_mask(self, skill):
+        """Boolean mask over all courses having a skill that contains ``skill``"""
+        return self._skill_mask(skill.strip().lower())
+
+    def _build_skill_mask(self, skill):
+        matching = [postings for name, postings in self.skill_postings.items() if skill in name]
+        mask = np.zeros(self.matrix.shape[0], dtype=bool)
+        if matching:
+            mask[np.concatenate(matching)] = True
+        return mask
+
+    def vectorize(self, query):
+        query_vector = self.vectorizer.transform([query])
+        if self.embedding is not None:
+            return self.embedding.project(query_vector)
+        return query_vector
+
+    def score(self, query_vector, positions):
+        if self.embedding is not None:
+            return self.embedding.score(query_vector, positions)
+        # Rows are L2-normalised, so the dot product is the cosine similarity
+        return (self.matrix[positions] @ query_vector.T).toarray().ravel()
+
+    def score_all(self, query_matrix):
+        """Scores of every course (rows) against every query (columns)"""
+        if self.embedding is not None:
+            query_embeddings = EmbeddingIndex.embed(query_matrix, self.embedding.components)
+            return self.embedding.embeddings @ query_embeddings.T
+        return (self.matrix @ query_matrix.T).toarray()
+
+class EmbeddingIndex:
+    """Latent semantic (LSA) view of the TF-IDF matrix.
+
+    TruncatedSVD projects every course onto a few hundred latent dimensions,
+    so related terms ("neural nets", "deep learning") land close together.
+    ``embeddings`` is a contiguous float32 matrix with unit rows and a query
+    is scored with one BLAS matrix-vector product.
+    """
+
+    def __init__(self, components, embeddings):
+        self.components = components
+        self.embeddings = embeddings
+
+    @classmethod
+    def build(cls, matrix, dimensions, seed=0):
+        n_components = max(1, min(dimensions, matrix.shape[0] - 1, matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=seed)
+        svd.fit(matrix)
+        components = np.ascontiguousarray(svd.components_, dtype=np.float32)
+        return cls(components, cls.embed(matrix, components))
+
+    @staticmethod
+    def embed(matrix, components):
+        """Project TF-IDF rows onto the latent dimensions and L2-normalise them"""
+        dense = np.asarray(matrix @ components.T, dtype=np.float32)
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        return np.ascontiguousarray(dense / np.maximum(norms, 1e-12))
+
+    def project(self, query_vector):
+        # A query has a handful of terms: combine just those component columns
+        query = query_vector.tocsr()
+        dense = self.components[:, query.indices] @ query.data.astype(np.float32)
+        return dense / max(np.linalg.norm(dense), 1e-12)
+
+    def score(self, query_embedding, positions):
+        if len(positions) == len(self.embeddings):
+            # Unfiltered query: positions are every row, so skip the gather
+            return self.embeddings @ query_embedding
+        return self.embeddings[positions] @ query_embedding
+
+class NeighborTable:
+    """Top-k most similar courses of every course, by TF-IDF cosine similarity.
+
+    Row ``i`` of ``ids`` (int32, -1 padded) lists the row positions of the
+    courses most similar to course ``i``, best first; ``scores`` (float16)
+    holds the matching similarities.
+    """
+
+    def __init__(self, ids, scores):
+        self.ids = ids
+        self.scores = scores
+
+    @property
+    def k(self):
+        return self.ids.shape[1]
+
+    @classmethod
+    def build(cls, matrix, k, workers=0):
+        positions = np.arange(matrix.shape[0])
+        ids, scores = compute_neighbors(matrix, positions, positions, k, workers)
+        return cls(ids, scores.astype(np.float16))
+
+    def similar(self, position, limit=None):
+        """``(row position, similarity)`` pairs of the courses most similar to ``position``"""
+        ids = self.ids[position, :limit]
+        found = ids >= 0
+        return list(zip(ids[found].tolist(), self.scores[position, :limit][found].astype(float).tolist()))
+
+    def update(self, matrix, old_to_new, fresh, workers=0):
+        """Table for a reloaded catalog, recomputing only what the reload can have changed.
+
+        ``old_to_new`` maps old row positions to new ones (-1 for removed or
+        changed courses) and ``fresh`` are the new positions of added or
+        changed ones. Fresh courses and courses that lost a neighbour are
+        scored against the whole catalog; the rest keep their neighbours and
+        are only scored against the fresh courses.
+        """
+        k = self.k
+        old_rows = np.flatnonzero(old_to_new >= 0)
+        mapped = np.where(self.ids[old_rows] >= 0, old_to_new[self.ids[old_rows]], -1)
+        lost = ((self.ids[old_rows] >= 0) & (mapped < 0)).any(axis=1)
+        clean = old_to_new[old_rows[~lost]]
+        dirty = np.sort(np.concatenate([fresh, old_to_new[old_rows[lost]]]))
+
+        ids = np.full((matrix.shape[0], k), -1, dtype=np.int32)
+        scores = np.zeros((matrix.shape[0], k), dtype=np.float16)
+        ids[dirty], dirty_scores = compute_neighbors(matrix, dirty, np.arange(matrix.shape[0]), k, workers)
+        scores[dirty] = dirty_scores
+
+        fresh_ids, fresh_scores = compute_neighbors(matrix, clean, np.sort(fresh), k, workers)
+        merged_ids = np.concatenate([mapped[~lost], fresh_ids], axis=1)
+        merged_scores = np.concatenate([self.scores[old_rows[~lost]].astype(np.float32), fresh_scores], axis=1)
+        order = np.argsort(-merged_scores, axis=1, kind='stable')[:, :k]
+        ids[clean] = np.take_along_axis(merged_ids, order, axis=1)
+        scores[clean] = np.take_along_axis(merged_scores, order, axis=1)
+        return NeighborTable(ids, scores)
+
+def top_neighbors(matrix, rows, columns, k):
+    """Best ``k`` of the (sorted) ``columns`` for each of ``rows``, never the row itself.
+
+    Returns int32 positions (-1 where fewer than ``k`` columns score above
+    zero) and float32 similarities, both shaped ``(len(rows), k)``.
+    """
+    ids = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+    if len(rows) == 0 or len(columns) == 0:
+        return ids, scores
+    similarities = (matrix[rows] @ matrix[columns].T).toarray().astype(np.float32)
+    # A course is not its own neighbour
+    self_columns = np.searchsorted(columns, rows).clip(max=len(columns) - 1)
+    is_self = columns[self_columns] == rows
+    similarities[np.flatnonzero(is_self), self_columns[is_self]] = 0
+
+    width = min(k, len(columns))
+    top = np.argpartition(-similarities, width - 1, axis=1)[:, :width]
+    top_scores = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    ids[:, :width] = np.where(top_scores > 0, columns[top], -1)
+    scores[:, :width] = np.where(top_scores > 0, top_scores, 0)
+    return ids, scores
+
+# Process pool workers receive the matrix once, through the pool initializer
+neighbor_worker_state = {}
+
+def init_neighbor_worker(matrix, columns, k):
+    neighbor_worker_state.update(matrix=matrix, columns=columns, k=k)
+
+def neighbor_worker_block(rows):
+    state = neighbor_worker_state
+    return top_neighbors(state['matrix'], rows, state['columns'], state['k'])
+
+def compute_neighbors(matrix, rows, columns, k, workers=0):
+    """``top_neighbors`` over row blocks of at most SIMILAR_BLOCK_CELLS scores each, optionally in a process pool"""
+    block_size = max(1, app.config['SIMILAR_BLOCK_CELLS'] // max(len(columns), 1))
+    blocks = [rows[start:start + block_size] for start in range(0, len(rows), block_size)]
+    if not blocks:
+        return np.empty((0, k), dtype=np.int32), np.empty((0, k), dtype=np.float32)
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(workers, initializer=init_neighbor_worker, initargs=(matrix, columns, k)) as pool:
+            parts = list(pool.map(neighbor_worker_block, blocks))
+    else:
+        parts = [top_neighbors(matrix, block, columns, k) for block in blocks]
+    return np.concatenate([ids for ids, _ in parts]), np.concatenate([scores for _, scores in parts])
+
+# Compiled catalog artifact
+ARTIFACT_FORMAT_VERSION = 7
+
+class ArtifactUnavailable(Exception):
+    """The compiled catalog is missing, unreadable or older than the CSV"""
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_strings(path, values):
+    """Store a string column as one UTF-8 buffer plus int64 offsets, both memory-mappable"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(f"{path}.utf8.npy", np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(f"{path}.offsets.npy", offsets)
+
+def load_strings(path):
+    buffer = np.load(f"{path}.utf8.npy", mmap_mode='r')
+    offsets = np.load(f"{path}.offsets.npy", mmap_mode='r')
+    raw = buffer.tobytes()
+    offsets = offsets.tolist()
+    return [raw[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+
+def save_columns(data, directory):
+    """Write each frame column as memory-mappable arrays; returns the manifest entry describing them"""
+    columns = {}
+    for col in data.columns:
+        series = data[col]
+        path = os.path.join(directory, f"col.{col}")
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(f"{path}.codes.npy", series.cat.codes.to_numpy())
+            columns[col] = {'kind': 'category', 'categories': [str(c) for c in series.cat.categories]}
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            np.save(f"{path}.npy", series.to_numpy())
+            columns[col] = {'kind': 'numeric'}
+        elif series.map(lambda value: isinstance(value, str) or pd.isna(value)).all():
+            missing = series.isna().to_numpy()
+            save_strings(path, series.fillna('').tolist())
+            if missing.any():
+                np.save(f"{path}.missing.npy", missing)
+            columns[col] = {'kind': 'string', 'has_missing': bool(missing.any())}
+        else:
+            logger.warning(f"Column {col} has non-scalar values and is not stored in the artifact")
+    return columns
+
+def load_columns(directory, specs):
+    """Rebuild a frame written by ``save_columns``, memory-mapping numeric data"""
+    def load(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+
+    columns = {}
+    for col, spec in specs.items():
+        path = os.path.join(directory, f"col.{col}")
+        if spec['kind'] == 'category':
+            # Codes were written in the dtype pandas picks for these categories, so they are used as mapped
+            columns[col] = pd.Categorical.from_codes(load(f"col.{col}.codes.npy"), categories=spec['categories'], validate=False)
+        elif spec['kind'] == 'numeric':
+            columns[col] = load(f"col.{col}.npy")
+        else:
+            values = pd.Series(load_strings(path), dtype=object)
+            if spec['has_missing']:
+                values[load(f"col.{col}.missing.npy")] = np.nan
+            columns[col] = values
+    # copy=False keeps one block per column instead of consolidating the mapped arrays into new memory
+    return pd.DataFrame(columns, copy=False)
+
+def save_catalog_artifact(data, index, output_dir, csv_hash):
+    """Write the prepared catalog and its course index as .npy arrays plus a JSON manifest.
+
+    The artifact is assembled in a sibling temporary directory and moved into
+    place at the end, so workers never see a half-written index.
+    """
+    staging_dir = f"{output_dir.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    columns = save_columns(data, staging_dir)
+
+    matrix = index.matrix
+    np.save(os.path.join(staging_dir, 'tfidf.data.npy'), matrix.data)
+    np.save(os.path.join(staging_dir, 'tfidf.indices.npy'), matrix.indices)
+    np.save(os.path.join(staging_dir, 'tfidf.indptr.npy'), matrix.indptr)
+    np.save(os.path.join(staging_dir, 'tfidf.idf.npy'), index.vectorizer.idf_)
+    np.save(os.path.join(staging_dir, 'has_features.npy'), index.has_features)
+    np.save(os.path.join(staging_dir, 'skills.ids.npy'), index.skills.ids)
+    np.save(os.path.join(staging_dir, 'skills.offsets.npy'), index.skills.offsets)
+    if index.embedding is not None:
+        np.save(os.path.join(staging_dir, 'lsa.components.npy'), index.embedding.components)
+        np.save(os.path.join(staging_dir, 'lsa.embeddings.npy'), index.embedding.embeddings)
+    if index.neighbors is not None:
+        np.save(os.path.join(staging_dir, 'neighbors.ids.npy'), index.neighbors.ids)
+        np.save(os.path.join(staging_dir, 'neighbors.scores.npy'), index.neighbors.scores)
+    terms = sorted(index.vectorizer.vocabulary_, key=index.vectorizer.vocabulary_.get)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'csv_sha256': csv_hash,
+        'created': datetime.now().isoformat(),
+        'rows': len(data),
+        'columns': columns,
+        'tfidf_shape': list(matrix.shape),
+        'lsa_dimensions': index.embedding.components.shape[0] if index.embedding is not None else None,
+        'similar_k': index.neighbors.k if index.neighbors is not None else None,
+        'terms': terms,
+        'skill_vocab': index.skills.vocab
+    }
+    with open(os.path.join(staging_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(staging_dir, output_dir)
+
+def load_catalog_artifact(artifact_dir, csv_path):
+    """Memory-map a compiled catalog, raising ArtifactUnavailable if it is missing or stale"""
+    manifest_path = os.path.join(artifact_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        raise ArtifactUnavailable(f"no compiled catalog at {artifact_dir}")
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactUnavailable("compiled catalog has an old format version")
+    if not os.path.exists(csv_path) or file_sha256(csv_path) != manifest['csv_sha256']:
+        raise ArtifactUnavailable(f"compiled catalog is stale against {csv_path}")
+
+    def load(name):
+        return np.load(os.path.join(artifact_dir, name), mmap_mode='r')
+
+    data = load_columns(artifact_dir, manifest['columns'])
+
+    terms = manifest['terms']
+    vectorizer = TfidfVectorizer(**TFIDF_PARAMS, vocabulary={term: i for i, term in enumerate(terms)})
+    vectorizer.idf_ = load('tfidf.idf.npy')
+    matrix = csr_matrix(
+        (load('tfidf.data.npy'), load('tfidf.indices.npy'), load('tfidf.indptr.npy')),
+        shape=tuple(manifest['tfidf_shape'])
+    )
+    skills = SkillTable(manifest['skill_vocab'], load('skills.ids.npy'), load('skills.offsets.npy'))
+    embedding = None
+    if manifest.get('lsa_dimensions'):
+        embedding = EmbeddingIndex(load('lsa.components.npy'), load('lsa.embeddings.npy'))
+    neighbors = None
+    if manifest.get('similar_k'):
+        neighbors = NeighborTable(load('neighbors.ids.npy'), load('neighbors.scores.npy'))
+    return data, CourseIndex(vectorizer, matrix, load('has_features.npy'), skills, embedding, neighbors)
+
+# Streaming ingest
+INGEST_FORMAT_VERSION = 1
+
+def hashing_vectorizer(n_features):
+    """Stateless counterpart of the TF-IDF vectorizer: terms are hashed instead of looked up"""
+    return HashingVectorizer(stop_words=TFIDF_PARAMS['stop_words'], ngram_range=TFIDF_PARAMS['ngram_range'],
+                             n_features=n_features, alternate_sign=False, norm=None)
+
+class HashedTfidf:
+    """Query transform for an ingested catalog: hashed term counts weighted by IDF, L2-normalised"""
+
+    def __init__(self, n_features, idf):
+        self.hasher = hashing_vectorizer(n_features)
+        self.idf = idf
+
+    def transform(self, texts):
+        return normalize(self.hasher.transform(texts).multiply(self.idf).tocsr())
+
+def run_bounded(function, tasks, workers):
+    """Yield ``function(*task)`` per task, in order, with at most two tasks per worker in flight"""
+    if workers <= 1:
+        for task in tasks:
+            yield function(*task)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(function, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def ingest_chunk(chunk, shard_dir, n_features):
+    """Clean, parse and hash one chunk of raw rows into a shard.
+
+    Returns the shard directory, its row count and the document frequency of
+    every hashed feature; empty chunks write nothing.
+    """
+    data = clean_catalog(chunk)
+    if data.empty:
+        return shard_dir, 0, np.zeros(n_features, dtype=np.int64)
+    data = prepare_filter_columns(data.reset_index(drop=True))
+    skills = SkillTable.parse(data['course_skills'])
+    features = build_course_features(data, skills)
+    counts = hashing_vectorizer(n_features).transform(features).tocsr()
+    counts.sum_duplicates()
+
+    os.makedirs(shard_dir)
+    np.save(os.path.join(shard_dir, 'counts.data.npy'), counts.data.astype(np.float32))
+    np.save(os.path.join(shard_dir, 'counts.indices.npy'), counts.indices)
+    np.save(os.path.join(shard_dir, 'counts.indptr.npy'), counts.indptr)
+    np.save(os.path.join(shard_dir, 'has_features.npy'), features.str.strip().astype(bool).to_numpy())
+    np.save(os.path.join(shard_dir, 'skills.ids.npy'), skills.ids)
+    np.save(os.path.join(shard_dir, 'skills.offsets.npy'), skills.offsets)
+    shard = {
+        'rows': len(data),
+        'columns': save_columns(compact_catalog(data), shard_dir),
+        'skill_vocab': skills.vocab
+    }
+    with open(os.path.join(shard_dir, 'shard.json'), 'w', encoding='utf-8') as f:
+        json.dump(shard, f, ensure_ascii=False)
+    return shard_dir, len(data), np.bincount(counts.indices, minlength=n_features)
+
+def finalize_shard(shard_dir, idf):
+    """Replace a shard's raw term counts with its IDF-weighted, L2-normalised rows"""
+    def load(name):
+        return np.load(os.path.join(shard_dir, name))
+
+    counts = csr_matrix((load('counts.data.npy'), load('counts.indices.npy'), load('counts.indptr.npy')), shape=(len(load('counts.indptr.npy')) - 1, len(idf)))
+    matrix = normalize(counts.multiply(idf).tocsr())
+    np.save(os.path.join(shard_dir, 'tfidf.data.npy'), matrix.data)
+    np.save(os.path.join(shard_dir, 'tfidf.indices.npy'), matrix.indices)
+    np.save(os.path.join(shard_dir, 'tfidf.indptr.npy'), matrix.indptr)
+    for part in ('data', 'indices', 'indptr'):
+        os.remove(os.path.join(shard_dir, f'counts.{part}.npy'))
+
+def ingest_catalog(sources, output_dir, chunk_size, workers=0):
+    """Stream catalog CSVs into an on-disk sharded index.
+
+    Rows are read ``chunk_size`` at a time and each chunk is cleaned, parsed
+    and hashed independently (optionally in a process pool), so memory is
+    bounded by the chunk size and the number of workers, not the input. A
+    second pass over the shards applies the IDF collected in the first.
+    Each run writes a new generation directory next to ``output_dir`` and
+    then points ``output_dir`` at it (see ``publish_ingest``).
+    """
+    output_dir = output_dir.rstrip(os.sep)
+    staging_dir = f"{output_dir}.{datetime.now():%Y%m%d%H%M%S%f}"
+    os.makedirs(staging_dir)
+    try:
+        manifest = write_ingest(sources, staging_dir, chunk_size, workers)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    publish_ingest(staging_dir, output_dir)
+    return manifest
+
+def write_ingest(sources, staging_dir, chunk_size, workers):
+    """Ingest ``sources`` into the empty ``staging_dir``, writing its manifest last"""
+    n_features = app.config['INGEST_HASH_FEATURES']
+
+    chunks = (chunk for path in sources for chunk in pd.read_csv(path, chunksize=chunk_size))
+    tasks = ((chunk, os.path.join(staging_dir, f"shard-{number:05d}"), n_features) for number, chunk in enumerate(chunks))
+    shards = []
+    rows = 0
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    for shard_dir, count, frequency in run_bounded(ingest_chunk, tasks, workers):
+        if count:
+            shards.append(os.path.basename(shard_dir))
+            rows += count
+            document_frequency += frequency
+            logger.info(f"Ingested {shard_dir} ({count} rows, {rows} total)")
+
+    # Same smoothed IDF as TfidfVectorizer
+    idf = np.log((1 + rows) / (1 + document_frequency)) + 1
+    np.save(os.path.join(staging_dir, 'idf.npy'), idf)
+    for _ in run_bounded(finalize_shard, ((os.path.join(staging_dir, shard), idf) for shard in shards), workers):
+        pass
+
+    manifest = {
+        'format_version': INGEST_FORMAT_VERSION,
+        'created': datetime.now().isoformat(),
+        'sources': [os.path.abspath(path) for path in sources],
+        'rows': rows,
+        'n_features': n_features,
+        'shards': shards
+    }
+    with open(os.path.join(staging_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return manifest
+
+def publish_ingest(generation_dir, output_dir):
+    """Make ``output_dir`` a symlink to ``generation_dir``, swapped in with one atomic rename.
+
+    A worker loading the catalog resolves the link once, so it sees the old or
+    the new generation and never a missing one. The generation just replaced
+    is kept for workers still reading it; older ones are deleted.
+    """
+    parent, name = os.path.split(os.path.abspath(output_dir))
+    generation = re.compile(re.escape(name) + r'\.\d{20}')
+    previous = os.path.basename(os.readlink(output_dir)) if os.path.islink(output_dir) else None
+    if os.path.isdir(output_dir) and previous is None:
+        # Shards written before ingests were versioned: moved aside once, then replaced by the link
+        previous = f"{name}.{datetime.now():%Y%m%d%H%M%S%f}"
+        os.replace(output_dir, os.path.join(parent, previous))
+    link = f"{output_dir}.link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(generation_dir), link)
+    os.replace(link, output_dir)
+    for entry in os.listdir(parent):
+        if generation.fullmatch(entry) and entry not in (os.path.basename(generation_dir), previous):
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+def load_catalog_shards(shard_root):
+    """Assemble an ingested catalog from its shards, raising ArtifactUnavailable if there is none"""
+    # One generation for the whole load, even if an ingest swaps the link meanwhile
+    shard_root = os.path.realpath(shard_root)
+    manifest_path = os.path.join(shard_root, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        raise ArtifactUnavailable(f"no ingested catalog at {shard_root}")
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != INGEST_FORMAT_VERSION:
+        raise ArtifactUnavailable("ingested catalog has an old format version")
+
+    frames, matrices, has_features, skill_tables = [], [], [], []
+    for shard in manifest['shards']:
+        shard_dir = os.path.join(shard_root, shard)
+        def load(name):
+            return np.load(os.path.join(shard_dir, name), mmap_mode='r')
+        with open(os.path.join(shard_dir, 'shard.json'), encoding='utf-8') as f:
+            spec = json.load(f)
+        frames.append(load_columns(shard_dir, spec['columns']))
+        matrices.append(csr_matrix((load('tfidf.data.npy'), load('tfidf.indices.npy'), load('tfidf.indptr.npy')),
+                                   shape=(spec['rows'], manifest['n_features'])))
+        has_features.append(load('has_features.npy'))
+        skill_tables.append(SkillTable(spec['skill_vocab'], load('skills.ids.npy'), load('skills.offsets.npy')))
+
+    data = ensure_unique_course_ids(compact_catalog(pd.concat(frames, ignore_index=True)))
+    vectorizer = HashedTfidf(manifest['n_features'], np.load(os.path.join(shard_root, 'idf.npy')))
+    index = CourseIndex(vectorizer, sparse_vstack(matrices).tocsr(), np.concatenate(has_features), SkillTable.concat(skill_tables))
+    return data, index
+
+def prepare_catalog(data):
+    """Clean-up shared by every load path: positional row labels, parsed filter columns and the course index"""
+    # Row labels double as positions into the course index
+    data = ensure_unique_course_ids(prepare_filter_columns(data.reset_index(drop=True)))
+    index = configure_neighbors(configure_engine(CourseIndex.build(data)))
+    return compact_catalog(data), index
+
+# Source columns only read while preparing the catalog (skills live in the SkillTable)
+DROPPED_COLUMNS = ['course_skills']
+# Repeated strings kept as categoricals: integer codes plus one copy of each distinct value
+COMPACT_COLUMNS = CATEGORICAL_COLUMNS + ['university_name', 'university_logo', 'course_type', 'time_required',
+                                         'course_subtitles', 'course_level', 'course_rating', 'subtitle_languages']
+
+def compact_catalog(data):
+    """Drop parsed-away source columns and store repeated display strings as categoricals"""
+    data = data.drop(columns=[col for col in data.columns if col in DROPPED_COLUMNS or col.startswith('Unnamed:')])
+    for col in COMPACT_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category').cat.remove_unused_categories()
+    return data
+
+def configure_engine(index, engine=None):
+    """Attach (building if needed) or drop the LSA embedding according to RECOMMENDER_ENGINE"""
+    engine = engine or app.config['RECOMMENDER_ENGINE']
+    if engine == 'lsa':
+        if index.embedding is None:
+            start = time.perf_counter()
+            index.embedding = EmbeddingIndex.build(index.matrix, app.config['LSA_DIMENSIONS'])
+            logger.info(f"LSA embedding built: {index.embedding.embeddings.shape} in {time.perf_counter() - start:.2f}s")
+    elif engine == 'tfidf':
+        index.embedding = None
+    else:
+        raise ValueError(f"Unknown RECOMMENDER_ENGINE: {engine}")
+    return index
+
+def configure_neighbors(index):
+    """Attach the similar-courses table, building it unless a matching one was loaded"""
+    k = app.config['SIMILAR_COURSES_K']
+    if k <= 0:
+        index.neighbors = None
+    elif index.neighbors is None or index.neighbors.k != k:
+        start = time.perf_counter()
+        index.neighbors = NeighborTable.build(index.matrix, k, app.config['SIMILAR_WORKERS'])
+        logger.info(f"Similar-courses table built: {index.neighbors.ids.shape} in {time.perf_counter() - start:.2f}s")
+    return index
+
+def load_catalog():
+    """Use the compiled artifact when it is fresh, otherwise parse the CSV (or fall back to sample data)"""
+    csv_path = app.config['CATALOG_CSV']
+    if app.config['CATALOG_SHARDS_DIR']:
+        try:
+            data, index = load_catalog_shards(app.config['CATALOG_SHARDS_DIR'])
+            logger.info(f"Ingested catalog loaded from {app.config['CATALOG_SHARDS_DIR']}")
+            return data, configure_neighbors(configure_engine(index))
+        except ArtifactUnavailable as e:
+            logger.info(f"{e}, using the CSV")
+        except Exception as e:
+            logger.warning(f"Could not load ingested catalog, falling back to CSV: {e}")
+    try:
+        data, index = load_catalog_artifact(app.config['CATALOG_INDEX_DIR'], csv_path)
+        logger.info(f"Compiled catalog loaded from {app.config['CATALOG_INDEX_DIR']}")
+        return data, configure_neighbors(configure_engine(index))
+    except ArtifactUnavailable as e:
+        logger.info(f"Building course index from CSV: {e}")
+    except Exception as e:
+        logger.warning(f"Could not load compiled catalog, falling back to CSV: {e}")
+
+    try:
+        data = load_catalog_csv(csv_path)
+        logger.info("Dataset loaded successfully")
+    except Exception as e:
+        logger.error(f"Error loading dataset: {e}")
+        data = sample_catalog()
+    return prepare_catalog(data)
+
+def compute_catalog_version(data, index):
+    """Hash of everything responses depend on, used to key cached results and as part of every ETag.
+
+    ``row_hash`` fingerprints all source columns of each row, in row order, so
+    any edit (a level, a skill list, subtitles) gives a new version; the
+    vectorizer's terms and IDF, the engine and the stats seed cover the rest.
+    """
+    digest = hashlib.sha1()
+    if 'row_hash' in data.columns:
+        digest.update(np.ascontiguousarray(data['row_hash'].to_numpy(dtype=np.uint64)).tobytes())
+    else:
+        # Only the built-in sample catalog has no source fingerprint; it never changes
+        digest.update(pd.util.hash_pandas_object(data[['course_name', 'course_link', 'category', 'time_required']], index=True).to_numpy().tobytes())
+    vectorizer = index.vectorizer
+    if isinstance(vectorizer, HashedTfidf):
+        digest.update(np.ascontiguousarray(vectorizer.idf, dtype=np.float64).tobytes())
+    else:
+        digest.update('\n'.join(vectorizer.get_feature_names_out()).encode('utf-8'))
+        digest.update(np.ascontiguousarray(vectorizer.idf_, dtype=np.float64).tobytes())
+    engine = (type(vectorizer).__name__, index.matrix.shape,
+              index.embedding.components.shape if index.embedding is not None else None,
+              index.neighbors.k if index.neighbors is not None else None, app.config['RATING_SEED'])
+    digest.update(repr(engine).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def normalize_course_name(name):
+    return ' '.join(str(name).split()).casefold()
+
+def ensure_unique_course_ids(data):
+    """Disambiguate colliding slugs with a short hash of the full link; the first course keeps the bare slug"""
+    duplicated = data['course_id'].duplicated()
+    if duplicated.any():
+        suffixes = data.loc[duplicated, 'course_link'].map(lambda link: hashlib.sha1(str(link).encode('utf-8')).hexdigest()[:8])
+        data.loc[duplicated, 'course_id'] = data.loc[duplicated, 'course_id'] + '-' + suffixes
+    return data
+
+class SuggestIndex:
+    """Typeahead over course names, skills, categories and sub-categories.
+
+    Every word-start suffix of every suggestion (UTF-8, truncated to
+    ``KEY_LENGTH`` bytes) is a key in one sorted fixed-width byte array, so a
+    prefix query is two binary searches.
+    Suggestions are numbered by descending popularity (total enrollment of the
+    courses they cover), which makes the best matches the smallest ids.
+    """
+
+    KEY_LENGTH = 32
+
+    def __init__(self, texts, kinds, keys, key_ids):
+        self.texts = texts
+        self.kinds = kinds
+        self.keys = keys
+        self.key_ids = key_ids
+
+    @classmethod
+    def build(cls, data, skills):
+        enrollment = data['enrollment'].to_numpy(dtype=np.int64)
+        popularity = {}
+        def add(text, kind, weight):
+            text = ' '.join(str(text).split())
+            if text:
+                key = (text.lower(), kind)
+                previous = popularity.get(key, (text, 0))
+                popularity[key] = (previous[0], previous[1] + weight)
+        for name, weight in zip(data['course_name'].tolist(), enrollment.tolist()):
+            add(name, 'course', weight)
+        course_of_skill = np.repeat(np.arange(len(data)), np.diff(skills.offsets))
+        skill_enrollment = np.bincount(skills.ids, weights=enrollment[course_of_skill], minlength=len(skills.vocab))
+        for skill, weight in zip(skills.vocab, skill_enrollment.tolist()):
+            add(skill, 'skill', int(weight))
+        for column, kind in (('category', 'category'), ('sub_category', 'sub_category')):
+            if column in data.columns:
+                totals = pd.Series(enrollment).groupby(data[column].astype(str).to_numpy()).sum()
+                for text, weight in totals.items():
+                    add(text, kind, int(weight))
+
+        # A text listed under several kinds ("Machine Learning") is suggested once, as its most popular kind
+        best = {}
+        for (lowered, kind), (text, weight) in popularity.items():
+            if lowered not in best or weight > best[lowered][2]:
+                best[lowered] = (text, kind, weight)
+        entries = sorted(best.values(), key=lambda entry: (-entry[2], entry[0]))
+        texts = [text for text, _, _ in entries]
+        kinds = [kind for _, kind, _ in entries]
+        pairs = []
+        for entry_id, text in enumerate(texts):
+            lowered = text.lower()
+            for match in re.finditer(r'\w', lowered):
+                if match.start() == 0 or not lowered[match.start() - 1].isalnum():
+                    pairs.append((lowered[match.start():].encode()[:cls.KEY_LENGTH], entry_id))
+        pairs.sort()
+        keys = np.array([key for key, _ in pairs], dtype=f'S{cls.KEY_LENGTH}')
+        return cls(texts, kinds, keys, np.array([entry_id for _, entry_id in pairs], dtype=np.int32))
+
+    def suggest(self, query, limit=8):
+        """Most popular suggestions with a word starting with ``query`` (case-insensitive)"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return []
+        prefix = query.encode()[:self.KEY_LENGTH]
+        lo = int(np.searchsorted(self.keys, prefix))
+        hi = int(np.searchsorted(self.keys, prefix + b'\xff'))
+        results = []
+        for entry_id in np.unique(self.key_ids[lo:hi]).tolist():
+            text = self.texts[entry_id]
+            # Keys are truncated, so long queries are confirmed against the full text
+            if len(prefix) == self.KEY_LENGTH and not re.search(r'(?<![^\W_])' + re.escape(query), ' '.join(text.lower().split())):
+                continue
+            results.append({'text': text, 'type': self.kinds[entry_id]})
+            if len(results) == limit:
+                break
+        return results
+
+class CatalogSnapshot:
+    """One loaded catalog: the prepared frame, its course index and a content version.
+
+    Snapshots are never mutated; a reload builds a new one and swaps the
+    module-level ``catalog`` reference.
+    """
+
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+        self.version = compute_catalog_version(data, index)
+        # Hash indexes from course id, link slug and normalised name to row position
+        self.positions_by_id = {course_id: i for i, course_id in enumerate(data['course_id'].tolist())}
+        self.positions_by_slug = {}
+        self.positions_by_name = {}
+        for i, (link, name) in enumerate(zip(data['course_link'].tolist(), data['course_name'].tolist())):
+            self.positions_by_slug.setdefault(course_slug(link), i)
+            self.positions_by_name.setdefault(normalize_course_name(name), i)
+        self.suggestions = SuggestIndex.build(data, index.skills)
+        self.facets = FacetIndex.build(data)
+
+    def find_course(self, ref):
+        """Row position for a course id, slug or (whitespace/case-insensitive) name, or None"""
+        ref = str(ref)
+        for lookup, key in [(self.positions_by_id, ref), (self.positions_by_slug, ref.strip()),
+                            (self.positions_by_name, normalize_course_name(ref))]:
+            if key in lookup:
+                return lookup[key]
+        return None
+
+def source_mtime(shards=False):
+    """Modification time of the catalog source: the CSV, or the ingest manifest when serving shards"""
+    path = os.path.join(app.config['CATALOG_SHARDS_DIR'], 'manifest.json') if shards else app.config['CATALOG_CSV']
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def serving_shards(snapshot=None):
+    """Whether the catalog came from CATALOG_SHARDS_DIR; only ingested catalogs use hashed term features"""
+    return isinstance((snapshot or current_catalog()).index.vectorizer, HashedTfidf)
+
+catalog = None
+catalog_mtime = None
+catalog_load_lock = threading.Lock()
+
+def current_catalog():
+    """The served catalog snapshot, loaded on first use"""
+    global catalog, catalog_mtime
+    if catalog is None:
+        with catalog_load_lock:
+            if catalog is None:
+                # Taken before loading, so a source rewritten during the load is picked up by the next reload
+                mtimes = (source_mtime(), source_mtime(shards=True))
+                snapshot = CatalogSnapshot(*load_catalog())
+                catalog_mtime = mtimes[serving_shards(snapshot)]
+                catalog = snapshot
+                logger.info(f"Course index ready: {catalog.index.matrix.shape[0]} courses, {catalog.index.matrix.shape[1]} features")
+    return catalog
+
+# Servers load the catalog on import so workers start ready. Flask CLI commands import the app
+# too but load it only if they use it, so `ingest` and `build-index` never hold the served catalog.
+if click.get_current_context(silent=True) is None:
+    current_catalog()
+
+@app.cli.command('build-index')
+@click.option('--output', default=None, help='Artifact directory (defaults to CATALOG_INDEX_DIR).')
+@click.option('--lsa/--no-lsa', default=None, help='Include the LSA embedding (defaults to on when RECOMMENDER_ENGINE=lsa).')
+def build_index_command(output, lsa):
+    """Compile the catalog CSV into a memory-mappable index artifact."""
+    csv_path = app.config['CATALOG_CSV']
+    output = output or app.config['CATALOG_INDEX_DIR']
+    start = time.perf_counter()
+    catalog, index = prepare_catalog(load_catalog_csv(csv_path))
+    if lsa is not None:
+        configure_engine(index, 'lsa' if lsa else 'tfidf')
+    save_catalog_artifact(catalog, index, output, file_sha256(csv_path))
+    click.echo(f"Compiled {len(catalog)} courses from {csv_path} into {output} in {time.perf_counter() - start:.2f}s")
+
+def resident_memory():
+    """Resident set size of this process in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def catalog_memory(snapshot):
+    """Approximate bytes held by each part of a catalog snapshot"""
+    index = snapshot.index
+    matrix = index.matrix
+    parts = {
+        'catalog frame': int(snapshot.data.memory_usage(deep=True).sum()),
+        'tfidf matrix': matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes,
+        'skill table': index.skills.ids.nbytes + index.skills.offsets.nbytes + sum(sys.getsizeof(skill) for skill in index.skills.vocab),
+        'facet bitsets': sum(bitsets.nbytes for bitsets in snapshot.facets.bitsets.values()),
+        'suggestions': snapshot.suggestions.keys.nbytes + snapshot.suggestions.key_ids.nbytes + sum(sys.getsizeof(text) for text in snapshot.suggestions.texts),
+        'lookup tables': sum(sys.getsizeof(lookup) for lookup in (snapshot.positions_by_id, snapshot.positions_by_slug, snapshot.positions_by_name))
+    }
+    if index.embedding is not None:
+        parts['lsa embedding'] = index.embedding.embeddings.nbytes + index.embedding.components.nbytes
+    if index.neighbors is not None:
+        parts['similar courses'] = index.neighbors.ids.nbytes + index.neighbors.scores.nbytes
+    return parts
+
+@app.cli.command('memory-report')
+@click.option('--compare/--no-compare', default=True, help='Also measure the uncompacted frame layout.')
+def memory_report_command(compare):
+    """Show this worker's resident size and the memory held by the catalog."""
+    megabytes = lambda size: f"{size / 2**20:8.2f} MB"
+    snapshot = current_catalog()
+    rss = resident_memory()
+    click.echo(f"Worker resident size: {megabytes(rss) if rss is not None else 'unavailable'}")
+    parts = catalog_memory(snapshot)
+    click.echo(f"Catalog ({len(snapshot.data)} courses): {megabytes(sum(parts.values()))}")
+    for name, size in sorted(parts.items(), key=lambda item: -item[1]):
+        click.echo(f"  {name:<16}{megabytes(size)}")
+    click.echo("Largest frame columns:")
+    columns = snapshot.data.memory_usage(deep=True, index=False).sort_values(ascending=False)
+    for col, size in columns.head(6).items():
+        click.echo(f"  {col:<20}{megabytes(size)}  {snapshot.data[col].dtype}")
+    if compare:
+        legacy = prepare_filter_columns(load_catalog_csv(app.config['CATALOG_CSV']))
+        click.echo(f"Uncompacted frame layout: {megabytes(legacy.memory_usage(deep=True).sum())} "
+                   f"(compact: {megabytes(parts['catalog frame'])})")
+
+@app.cli.command('ingest')
+@click.argument('sources', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', default=None, help='Shard directory (defaults to CATALOG_SHARDS_DIR, else catalog_shards).')
+@click.option('--chunk-size', default=50000, show_default=True, help='Rows read and processed per chunk.')
+@click.option('--workers', default=0, show_default=True, help='Worker processes (0 = in-process).')
+def ingest_command(sources, output, chunk_size, workers):
+    """Stream one or more catalog CSVs into a sharded, hashed index."""
+    output = output or app.config['CATALOG_SHARDS_DIR'] or 'catalog_shards'
+    start = time.perf_counter()
+    manifest = ingest_catalog(list(sources), output, chunk_size, workers)
+    rss = resident_memory()
+    click.echo(f"Ingested {manifest['rows']} courses into {len(manifest['shards'])} shards in {output} "
+               f"in {time.perf_counter() - start:.2f}s" + (f" (resident {rss / 2**20:.0f} MB)" if rss else ''))
+
+def top_k_indices(scores, k):
+    """Indices of the ``k`` highest scores, best first; ties go to the lower index"""
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # Most scores tie at zero when a query shares terms with few courses. Selecting the k-th
+        # smallest negated score stays fast on such input, and only the lowest-index ties at the
+        # k-th score are kept, so the sort below handles about k items
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        candidates = np.concatenate([above, np.flatnonzero(scores == kth)[:k - len(above)]])
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+def rank_courses(user_input, filtered_courses, top_n=8, offset=0, index=None):
+    """Return ``(row position, similarity)`` pairs for ranks ``offset`` to ``offset + top_n``"""
+    return rank_positions(user_input, filtered_courses.index.to_numpy(), top_n, offset, index)
+
+def rank_positions(user_input, positions, top_n=8, offset=0, index=None):
+    """``rank_courses`` over an array of candidate row positions"""
+    index = index or current_catalog().index
     
     user_topic, user_skills, user_category, user_difficulty, user_language, user_time, user_subtitles = user_input
     user_query = f"{user_topic} {user_skills} {user_category}"
     
-    try:
-        filtered_courses = filtered_courses.copy()
-        filtered_courses['course_features'] = (
-            filtered_courses['course_name'] + " " + 
-            filtered_courses['category'] + " " +
-            filtered_courses['course_skills'].apply(
-                lambda x: ' '.join(eval(x)) if isinstance(x, str) and x.startswith('[') else str(x)
-            )
-        )
-        
-        filtered_courses = filtered_courses[filtered_courses['course_features'].str.strip().astype(bool)]
-        
-        if filtered_courses.empty:
-            return []
-        
-        tfidf_matrix = vectorizer.fit_transform(filtered_courses['course_features'])
-        user_input_tfidf = vectorizer.transform([user_query])
-        
-        cosine_sim = cosine_similarity(user_input_tfidf, tfidf_matrix)
-        
-        sim_scores = list(enumerate(cosine_sim[0]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+    positions = positions[index.has_features[positions]]
+    
+    if len(positions) == 0:
+        return []
+    
+    with timed_stage('vectorize'):
+        query_vector = index.vectorize(user_query)
+    with timed_stage('score'):
+        scores = index.score(query_vector, positions)
+    with timed_stage('topk'):
+        top = top_k_indices(scores, offset + top_n)[offset:]
+    return list(zip(positions[top].tolist(), scores[top].tolist()))
+
+RESULT_COLUMNS = ['course_id', 'course_name', 'course_link', 'category', 'time_required', 'difficulty', 'rating', 'reviews', 'enrollment'] + STAR_COLUMNS
+
+def build_course_results(ranked, snapshot=None):
+    if not ranked:
+        return []
+    snapshot = snapshot or current_catalog()
+    positions = [position for position, _ in ranked]
+    rows = snapshot.data.iloc[positions][RESULT_COLUMNS].to_dict('records')
+    community = rating_store.get_aggregates([row['course_id'] for row in rows])
+    
+    top_courses = []
+    for (position, score), course in zip(ranked, rows):
+        stars, rating_percentages, total_reviews = rating_breakdown(course)
         
-        top_courses = []
-        for i in sim_scores[:top_n]:
-            course = filtered_courses.iloc[i[0]]
-            
-            # Generate star distribution 
-            if 'stars_distribution' not in course or not course['stars_distribution']:
-                stars = generate_realistic_ratings()['stars']
-            else:
-                stars = course['stars_distribution']
-            
-            # Calculate rating percentage
-            total_reviews = sum(stars.values())
-            rating_percentages = {str(k): round((v / total_reviews) * 100, 1) for k, v in stars.items()}
-            
-            course_data = {
-                'name': course['course_name'],
-                'link': course['course_link'],
-                'category': course.get('category', 'General'),
-                'skills': course.get('course_skills', '[]'),
-                'duration': course.get('time_required', 'Not specified'),
-                'difficulty': course.get('difficulty', 'Not specified'),
-                'rating': course.get('rating', 4.5),
-                'reviews': course.get('reviews', 0),
-                'enrollment': course.get('enrollment', 0),
-                'stars_distribution': stars,
-                'rating_percentages': rating_percentages,
-                'total_reviews': total_reviews,
-                'similarity_score': min(round(i[1] * 100, 1), 99.9),
-                'course_id': f"course_{len(top_courses) + 1}"
-            }
-            top_courses.append(course_data)
-            
-        return top_courses
+        course_data = {
+            'name': course['course_name'],
+            'link': course['course_link'],
+            'category': course.get('category', 'General'),
+            'skills': snapshot.index.skills.skills_for(position),
+            'duration': course.get('time_required', 'Not specified'),
+            'difficulty': course.get('difficulty', 'Not specified'),
+            'rating': round(course['rating'], 1),
+            'reviews': course['reviews'],
+            'enrollment': course['enrollment'],
+            'stars_distribution': stars,
+            'rating_percentages': rating_percentages,
+            'total_reviews': total_reviews,
+            'similarity_score': min(max(round(score * 100, 1), 0.0), 99.9),
+            'course_id': course['course_id'],
+            'community_rating': community[course['course_id']]
+        }
+        top_courses.append(course_data)
         
+    return top_courses
+
+def recommend_courses(user_input, filtered_courses, top_n=8, offset=0):
+    try:
+        return build_course_results(rank_courses(user_input, filtered_courses, top_n, offset))
     except Exception as e:
         logger.error(f"Error in recommendation: {e}")
         return []
 
+@app.cli.command('evaluate-engines')
+@click.option('--queries', default=200, help='Course names sampled as extra queries.')
+@click.option('--top-n', default=8, help='Results compared per query.')
+def evaluate_engines_command(queries, top_n):
+    """Compare latency and result overlap of the TF-IDF and LSA engines."""
+    snapshot = current_catalog()
+    tfidf_index = CourseIndex(snapshot.index.vectorizer, snapshot.index.matrix, snapshot.index.has_features, snapshot.index.skills)
+    lsa_index = CourseIndex(tfidf_index.vectorizer, tfidf_index.matrix, tfidf_index.has_features, tfidf_index.skills, snapshot.index.embedding)
+    configure_engine(lsa_index, 'lsa')
+
+    rng = np.random.default_rng(app.config['RATING_SEED'])
+    names = snapshot.data['course_name'].to_numpy()
+    sample = names[rng.choice(len(names), size=min(queries, len(names)), replace=False)]
+    topics = predefined_skills + predefined_categories + sample.tolist()
+
+    results = {}
+    for engine, index in (('tfidf', tfidf_index), ('lsa', lsa_index)):
+        latencies, rankings = [], []
+        for topic in topics:
+            start = time.perf_counter()
+            ranked = rank_courses((topic, '', '', 'Any', 'Any', 'Any', 'Any'), snapshot.data, top_n, index=index)
+            latencies.append(time.perf_counter() - start)
+            rankings.append({position for position, _ in ranked})
+        latencies = np.array(latencies) * 1000
+        results[engine] = rankings
+        click.echo(f"{engine:>6}: mean {latencies.mean():.2f} ms, p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms")
+
+    overlap = np.mean([len(a & b) / top_n for a, b in zip(results['tfidf'], results['lsa'])])
+    click.echo(f"Mean overlap@{top_n} of LSA with TF-IDF over {len(topics)} queries: {overlap:.2f}")
+
+class ResultCache:
+    """Bounded LRU cache with TTL expiry and single-flight misses.
+
+    Concurrent misses on the same key wait for the first caller's
+    computation instead of running their own.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = self._inflight[key] = Future()
+                generation = self._generation
+                leader = True
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Results computed against a catalog that was reloaded meanwhile are not kept
+            if generation == self._generation and self.maxsize > 0:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class ScoringOverloaded(Exception):
+    """The scoring queue is full (or a task timed out); answered with 503 and Retry-After"""
+
+class ScoringExecutor:
+    """Bounded thread pool for the CPU-bound scoring stages.
+
+    At most ``queue_limit`` tasks may be running or waiting. Beyond that,
+    ``run`` fails fast with ScoringOverloaded, so a traffic spike sheds load
+    instead of stretching every request's latency. Tasks run in a copy of the
+    caller's context, so request-scoped stage timings still reach the
+    Server-Timing header. With ``workers`` 0 tasks run on the request thread,
+    still subject to the limit.
+    """
+
+    def __init__(self, workers, queue_limit, timeout):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scoring') if workers > 0 else None
+        self._lock = threading.Lock()
+
+    def run(self, function, *args):
+        with self._lock:
+            if self.in_flight >= self.queue_limit:
+                self.rejected += 1
+                raise ScoringOverloaded(f"scoring queue full ({self.in_flight} tasks)")
+            self.in_flight += 1
+        if self._pool is None:
+            try:
+                return function(*args)
+            finally:
+                self._release()
+
+        future = self._pool.submit(contextvars.copy_context().run, function, *args)
+        # The slot is freed when the task finishes, even if its caller gave up waiting
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise ScoringOverloaded(f"scoring took longer than {self.timeout}s")
+
+    def _release(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_limit': self.queue_limit,
+                'in_flight': self.in_flight,
+                'saturation': round(self.in_flight / self.queue_limit, 4) if self.queue_limit else 1.0,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts
+            }
+
+scoring_executor = ScoringExecutor(app.config['SCORING_WORKERS'], app.config['SCORING_QUEUE_LIMIT'], app.config['SCORING_TIMEOUT'])
+
+def normalize_user_input(user_input):
+    """Case- and whitespace-insensitive form of the query tuple, used as the cache key"""
+    return tuple(' '.join(str(value).lower().split()) for value in user_input)
+
+recommendation_cache = ResultCache(app.config['RECOMMEND_CACHE_SIZE'], app.config['RECOMMEND_CACHE_TTL'])
+
+def cached_recommendations(user_input, top_n=8, offset=0, snapshot=None, user_id=None):
+    # One snapshot for the whole request, even if a reload swaps the catalog meanwhile
+    snapshot = snapshot or current_catalog()
+    predicted = co_ratings.predict(user_id, snapshot.positions_by_id) if user_id else None
+    # Users with ratings get a wider content ranking, shared through the cache, re-ranked for them
+    pool, start = (max(app.config['COLLAB_CANDIDATES'], offset + top_n), 0) if predicted else (top_n, offset)
+    key = (snapshot.version, normalize_user_input(user_input), pool, start)
+    # Identical in-flight queries wait on the first one; only that one takes a scoring slot
+    ranked = recommendation_cache.get_or_compute(key, lambda: scoring_executor.run(compute_ranking, snapshot, user_input, pool, start))
+    if predicted:
+        with timed_stage('collaborative'):
+            ranked = blend_collaborative(ranked, predicted, app.config['COLLAB_WEIGHT'])[offset:offset + top_n]
+    with timed_stage('results'):
+        return build_course_results(ranked, snapshot)
+
+def blend_collaborative(ranked, predicted, weight):
+    """Re-rank ``(position, score)`` pairs by content score plus ``weight`` times the predicted rating scaled to -1..1"""
+    if not ranked:
+        return ranked
+    positions = np.fromiter((position for position, _ in ranked), dtype=np.int64, count=len(ranked))
+    scores = np.fromiter((score for _, score in ranked), dtype=np.float64, count=len(ranked))
+    courses, ratings = predicted
+    slots = np.searchsorted(courses, positions).clip(max=len(courses) - 1)
+    scores += weight * np.where(courses[slots] == positions, ratings[slots] / 2, 0.0)
+    order = np.argsort(-scores, kind='stable')
+    return list(zip(positions[order].tolist(), scores[order].tolist()))
+
+# Card keys cover everything a card shows, so entries never go stale; the TTL only bounds idle ones
+card_cache = ResultCache(app.config['CARD_CACHE_SIZE'], ttl=86400)
+
+@app.template_global()
+def course_card(course, theme, mode, catalog_version):
+    """Body markup of one result card, rendered once per course, catalog version, theme, mode and community rating"""
+    community = course['community_rating']
+    key = (catalog_version, course['course_id'], theme, mode, community['count'], community['average'])
+    return card_cache.get_or_compute(key, lambda: Markup(render_template('_course_card.html', course=course,
+                                                                         current_theme=theme, current_mode=mode)))
+
+def etag_for(*parts):
+    """Strong validator for a response that is fully determined by ``parts``"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+def not_modified(etag):
+    """Bodiless 304 for a client whose If-None-Match already holds ``etag``, else None"""
+    if etag not in request.if_none_match:
+        return None
+    return with_etag(Response(status=304), etag)
+
+def with_etag(response, etag):
+    response = make_response(response)
+    response.set_etag(etag)
+    # Browsers may keep the body but must revalidate it before every reuse
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def compute_ranking(snapshot, user_input, top_n, offset):
+    # Filters produce row positions; the catalog frame itself is never copied
+    with timed_stage('filter'):
+        positions = np.flatnonzero(preference_mask(snapshot.data, user_input, snapshot.index, snapshot.facets))
+    return tuple(rank_positions(user_input, positions, top_n, offset, snapshot.index))
+
+def batch_rank(snapshot, user_inputs, top_n=8):
+    """Rank many queries at once, returning ``(row position, similarity)`` pairs per query.
+
+    All query strings go through the vectorizer together and are scored with
+    one sparse matrix product per block of queries; blocks are sized so the
+    dense score block stays under BATCH_SCORE_CELLS. Filter masks are computed
+    once per distinct filter combination.
+    """
+    index = snapshot.index
+    n_courses = len(snapshot.data)
+    if not user_inputs or n_courses == 0:
+        return [[] for _ in user_inputs]
+
+    with timed_stage('filter'):
+        masks = {}
+        candidates = []
+        for user_input in user_inputs:
+            filters = normalize_user_input(user_input[1:])
+            if filters not in masks:
+                masks[filters] = np.flatnonzero(preference_mask(snapshot.data, user_input, index, snapshot.facets) & index.has_features)
+            candidates.append(masks[filters])
+
+    with timed_stage('vectorize'):
+        query_matrix = index.vectorizer.transform([f"{topic} {skills} {category}" for topic, skills, category, *_ in user_inputs])
+
+    block_size = max(1, app.config['BATCH_SCORE_CELLS'] // n_courses)
+    ranked = []
+    for start in range(0, len(user_inputs), block_size):
+        with timed_stage('score'):
+            scores = index.score_all(query_matrix[start:start + block_size])
+        with timed_stage('topk'):
+            for column, positions in enumerate(candidates[start:start + block_size]):
+                query_scores = scores[positions, column]
+                top = top_k_indices(query_scores, top_n)
+                ranked.append(list(zip(positions[top].tolist(), query_scores[top].tolist())))
+    return ranked
+
+def batch_recommendations(queries, top_n=8):
+    """Top ``top_n`` course ids and similarity scores for each query.
+
+    ``queries`` are dicts with a ``topic`` and optional ``skills``, ``category``,
+    ``difficulty``, ``language``, ``time`` and ``subtitles`` filters.
+    """
+    snapshot = current_catalog()
+    user_inputs = [
+        (str(query.get('topic', '')).strip(), query.get('skills', 'Any'), query.get('category', 'Any'),
+         query.get('difficulty', 'Any'), query.get('language', 'Any'), query.get('time', 'Any'),
+         query.get('subtitles', 'Any'))
+        for query in queries
+    ]
+    course_ids = snapshot.data['course_id'].to_numpy()
+    return [
+        {
+            'course_ids': course_ids[[position for position, _ in ranked]].tolist(),
+            'scores': [round(score, 4) for _, score in ranked]
+        }
+        for ranked in batch_rank(snapshot, user_inputs, top_n)
+    ]
+
+# Catalog hot reload
+def diff_catalog(old, new):
+    """Match rows of a freshly loaded catalog against the current one by course link.
+
+    Returns the old position of every new row (-1 when added), a mask of new
+    rows whose source fields are unchanged, and the number of removed rows.
+    """
+    old_links = pd.Index(old['course_link'])
+    if not old_links.is_unique or not new['course_link'].is_unique:
+        raise ValueError("course links are not unique")
+    old_positions = old_links.get_indexer(new['course_link'])
+    matched = old_positions >= 0
+    unchanged = np.zeros(len(new), dtype=bool)
+    unchanged[matched] = old['row_hash'].to_numpy()[old_positions[matched]] == new['row_hash'].to_numpy()[matched]
+    removed = len(old) - int(matched.sum())
+    return old_positions, unchanged, removed
+
+def update_catalog(snapshot, new_data):
+    """Build the next snapshot, reusing parsed rows, skills and TF-IDF rows of unchanged courses.
+
+    Only added and changed rows are parsed and transformed with the existing
+    vectorizer; new terms therefore only enter the vocabulary on a full
+    rebuild, which happens when too large a share of the catalog changed.
+    """
+    new_data = new_data.reset_index(drop=True)
+    old_positions, unchanged, removed = diff_catalog(snapshot.data, new_data)
+    stats = {'added': int((old_positions < 0).sum()), 'changed': int(((old_positions >= 0) & ~unchanged).sum()),
+             'removed': removed, 'unchanged': int(unchanged.sum())}
+    if stats['added'] == stats['changed'] == stats['removed'] == 0:
+        return None, stats
+    if (stats['added'] + stats['changed'] + stats['removed']) > app.config['CATALOG_REBUILD_FRACTION'] * len(new_data):
+        stats['mode'] = 'full'
+        return CatalogSnapshot(*prepare_catalog(new_data)), stats
+    stats['mode'] = 'incremental'
+
+    old_data, old_index = snapshot.data, snapshot.index
+    kept = np.flatnonzero(unchanged)
+    fresh = np.flatnonzero(~unchanged)
+    reused_rows = old_positions[kept]
+
+    fresh_data = prepare_filter_columns(new_data.iloc[fresh].copy())
+    fresh_skills = SkillTable.parse(fresh_data['course_skills'])
+    fresh_features = build_course_features(fresh_data, fresh_skills)
+
+    # Stack reused and fresh rows, then put them back in the new catalog's order
+    order = np.argsort(np.concatenate([kept, fresh]), kind='stable')
+    combined = pd.concat([old_data.iloc[reused_rows], fresh_data])
+    combined = combined.iloc[order].reset_index(drop=True)
+    combined = compact_catalog(combined)
+    ensure_unique_course_ids(combined)
+    if len(fresh):
+        fresh_matrix = old_index.vectorizer.transform(fresh_features)
+    else:
+        fresh_matrix = csr_matrix((0, old_index.matrix.shape[1]), dtype=old_index.matrix.dtype)
+    matrix = sparse_vstack([old_index.matrix[reused_rows], fresh_matrix]).tocsr()[order]
+    has_features = np.concatenate([old_index.has_features[reused_rows], fresh_features.str.strip().astype(bool).to_numpy()])[order]
+    skill_lists = [old_index.skills.skills_for(position) for position in reused_rows]
+    skill_lists += [fresh_skills.skills_for(position) for position in range(len(fresh))]
+    skills = SkillTable.from_lists([skill_lists[i] for i in order])
+
+    embedding = None
+    if old_index.embedding is not None:
+        # New rows are projected onto the existing latent dimensions
+        old_embedding = old_index.embedding
+        embeddings = np.concatenate([old_embedding.embeddings[reused_rows], EmbeddingIndex.embed(fresh_matrix, old_embedding.components)])[order]
+        embedding = EmbeddingIndex(old_embedding.components, np.ascontiguousarray(embeddings))
+
+    neighbors = None
+    if old_index.neighbors is not None:
+        old_to_new = np.full(len(old_data), -1, dtype=np.int64)
+        old_to_new[reused_rows] = kept
+        neighbors = old_index.neighbors.update(matrix, old_to_new, fresh, app.config['SIMILAR_WORKERS'])
+
+    index = configure_neighbors(CourseIndex(old_index.vectorizer, matrix, has_features, skills, embedding, neighbors))
+    return CatalogSnapshot(combined, index), stats
+
+def publish_catalog(snapshot):
+    """Swap in a new snapshot; requests already running keep the one they started with"""
+    global catalog
+    catalog = snapshot
+    recommendation_cache.clear()
+    card_cache.clear()
+
+reload_lock = threading.Lock()
+
+def reload_catalog(full=False):
+    """Re-read the catalog source (the CSV, or the ingested shards if those are served) and publish it if anything changed"""
+    global catalog_mtime
+    with reload_lock:
+        if serving_shards():
+            return reload_shards()
+        csv_path = app.config['CATALOG_CSV']
+        mtime = os.path.getmtime(csv_path)
+        start = time.perf_counter()
+        new_data = load_catalog_csv(csv_path)
+        current = current_catalog()
+        if full or 'row_hash' not in current.data.columns:
+            snapshot, stats = CatalogSnapshot(*prepare_catalog(new_data)), {'mode': 'full'}
+        else:
+            try:
+                snapshot, stats = update_catalog(current, new_data)
+            except ValueError as e:
+                logger.warning(f"Incremental reload not possible ({e}), rebuilding")
+                snapshot, stats = CatalogSnapshot(*prepare_catalog(new_data)), {'mode': 'full'}
+        if snapshot is not None:
+            publish_catalog(snapshot)
+        catalog_mtime = mtime
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        stats['catalog_version'] = catalog.version
+        logger.info(f"Catalog reload: {stats}")
+        return stats
+
+def reload_shards():
+    """Reassemble the catalog from CATALOG_SHARDS_DIR; ingested catalogs are always reloaded in full.
+
+    The new snapshot is published unless its version, which covers every source
+    field of every row and the re-ingest's IDF, equals the served one.
+    """
+    global catalog_mtime
+    mtime = source_mtime(shards=True)
+    start = time.perf_counter()
+    data, index = load_catalog_shards(app.config['CATALOG_SHARDS_DIR'])
+    snapshot = CatalogSnapshot(data, configure_neighbors(configure_engine(index)))
+    stats = {'mode': 'shards', 'courses': len(data), 'changed': snapshot.version != current_catalog().version}
+    if stats['changed']:
+        publish_catalog(snapshot)
+    catalog_mtime = mtime
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['catalog_version'] = catalog.version
+    logger.info(f"Catalog reload: {stats}")
+    return stats
+
+def watch_catalog(interval):
+    """Poll the catalog source's mtime and reload once it has changed and stayed unchanged for a full interval"""
+    while True:
+        time.sleep(interval)
+        # Nothing to reload before the first load, which reads the current source anyway
+        if catalog is None:
+            continue
+        try:
+            mtime = source_mtime(shards=serving_shards())
+            # Skip files that are still being written
+            if mtime is not None and mtime != catalog_mtime and time.time() - mtime >= interval:
+                reload_catalog()
+        except Exception as e:
+            logger.error(f"Catalog watcher failed to reload: {e}")
+
+if app.config['CATALOG_WATCH_INTERVAL'] > 0:
+    threading.Thread(target=watch_catalog, args=(app.config['CATALOG_WATCH_INTERVAL'],), daemon=True, name='catalog-watcher').start()
+
 # Routes
 @app.route('/')
 def home():
@@ -326,18 +2441,20 @@ def home():
                          current_theme=theme,
                          current_mode=mode)
 
-@app.route('/recommend', methods=['POST'])
+@app.route('/recommend', methods=['GET', 'POST'])
+@add_loading_animation
 def recommend():
     try:
-        user_topic = request.form.get('topic', '').strip()
-        user_skills = request.form.get('skills', 'Any')
-        user_category = request.form.get('category', 'Any')
-        user_difficulty = request.form.get('difficulty', 'Any')
-        user_language = request.form.get('language', 'English')
-        user_time = request.form.get('time', 'Any')
-        user_subtitles = request.form.get('subtitles', 'English')
-        theme = request.form.get('theme', 'default')
-        mode = request.form.get('mode', 'dark')
+        # The search form submits with GET so result pages can be revalidated; POST still works
+        user_topic = request.values.get('topic', '').strip()
+        user_skills = request.values.get('skills', 'Any')
+        user_category = request.values.get('category', 'Any')
+        user_difficulty = request.values.get('difficulty', 'Any')
+        user_language = request.values.get('language', 'Any')
+        user_time = request.values.get('time', 'Any')
+        user_subtitles = request.values.get('subtitles', 'Any')
+        theme = request.values.get('theme', 'default')
+        mode = request.values.get('mode', 'dark')
         
         # Store theme preferences in session
         session['theme'] = theme
@@ -358,8 +2475,21 @@ def recommend():
         
         user_input = (user_topic, user_skills, user_category, user_difficulty, user_language, user_time, user_subtitles)
         
-        filtered_courses = filter_courses_by_preferences(data, user_input)
-        recommended_courses = recommend_courses(user_input, filtered_courses)
+        try:
+            offset = max(int(request.values.get('offset', 0)), 0)
+        except ValueError:
+            offset = 0
+        
+        # A repeat view of an unchanged page skips filtering, scoring and rendering
+        snapshot = current_catalog()
+        user_id = session.get('user_id')
+        # Only state shared by all workers goes into the tag: the synced index is the same on each
+        ratings_version = co_ratings.sync(rating_store)
+        etag = etag_for(snapshot.version, ratings_version, user_id, normalize_user_input(user_input), offset, theme, mode)
+        cached_page = not_modified(etag)
+        if cached_page is not None:
+            return cached_page
+        recommended_courses = cached_recommendations(user_input, offset=offset, snapshot=snapshot, user_id=user_id)
         
         session['last_search'] = {
             'query': user_topic,
@@ -367,20 +2497,24 @@ def recommend():
             'timestamp': time.time()
         }
         
-        return render_template('recommendations.html', 
-                             recommended_courses=recommended_courses,
-                             search_query=user_topic,
-                             results_count=len(recommended_courses),
-                             themes=THEMES,
-                             current_theme=theme,
-                             current_mode=mode,
-                             filters_applied={
-                                 'skills': user_skills,
-                                 'category': user_category,
-                                 'difficulty': user_difficulty,
-                                 'duration': user_time
-                             })
+        with timed_stage('render'):
+            return with_etag(render_template('recommendations.html', 
+                                 recommended_courses=recommended_courses,
+                                 search_query=user_topic,
+                                 results_count=len(recommended_courses),
+                                 themes=THEMES,
+                                 current_theme=theme,
+                                 current_mode=mode,
+                                 catalog_version=snapshot.version,
+                                 filters_applied={
+                                     'skills': user_skills,
+                                     'category': user_category,
+                                     'difficulty': user_difficulty,
+                                     'duration': user_time
+                                 }), etag)
                              
+    except ScoringOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in recommendation route: {e}")
         return render_template('index.html',
@@ -391,8 +2525,8 @@ def recommend():
                              subtitles=predefined_subtitles,
                              durations=predefined_durations,
                              themes=THEMES,
-                             current_theme=request.form.get('theme', 'default'),
-                             current_mode=request.form.get('mode', 'dark'),
+                             current_theme=request.values.get('theme', 'default'),
+                             current_mode=request.values.get('mode', 'dark'),
                              error="An error occurred while processing your request")
 
 # Theme API endpoints
@@ -433,11 +2567,15 @@ def get_theme_preferences():
         theme = session.get('theme', 'default')
         mode = session.get('mode', 'dark')
         
-        return jsonify({
+        etag = etag_for('theme', theme, mode)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        return with_etag(jsonify({
             'success': True,
             'theme': theme,
             'mode': mode
-        })
+        }), etag)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -445,21 +2583,29 @@ def get_theme_preferences():
         })
 
 # Rating API endpoints
+def get_user_id():
+    """Anonymous but stable per-browser id, kept in the signed session cookie"""
+    if 'user_id' not in session:
+        session['user_id'] = uuid.uuid4().hex
+    return session['user_id']
+
 @app.route('/api/rate_course', methods=['POST'])
 def rate_course():
     try:
         rating_data = request.get_json()
         course_id = rating_data.get('course_id')
         rating = rating_data.get('rating')
-        user_id = session.get('user_id', 'anonymous')
+        user_id = get_user_id()
         
-        if not course_id or rating not in [1, 2, 3, 4, 5]:
+        if not course_id or isinstance(rating, bool) or rating not in [1, 2, 3, 4, 5]:
             return jsonify({'success': False, 'error': 'Invalid rating data'})
         
-        # Store rating (in production, use database)
-        if user_id not in user_ratings:
-            user_ratings[user_id] = {}
-        user_ratings[user_id][course_id] = rating
+        snapshot = current_catalog()
+        position = snapshot.find_course(course_id)
+        if position is None:
+            return jsonify({'success': False, 'error': 'Unknown course'}), 404
+        course_id = snapshot.data['course_id'].iat[position]
+        rating_store.add_rating(user_id, course_id, int(rating))
         
         # Log the rating
         logger.info(f"User {user_id} rated course {course_id}: {rating} stars")
@@ -477,8 +2623,11 @@ def rate_course():
 @app.route('/api/get_rating/<course_id>')
 def get_rating(course_id):
     try:
-        user_id = session.get('user_id', 'anonymous')
-        user_rating = user_ratings.get(user_id, {}).get(course_id)
+        snapshot = current_catalog()
+        position = snapshot.find_course(course_id)
+        if position is None:
+            return jsonify({'success': False, 'error': 'Unknown course'}), 404
+        user_rating = rating_store.get_user_rating(get_user_id(), snapshot.data['course_id'].iat[position])
         
         return jsonify({
             'success': True,
@@ -488,51 +2637,235 @@ def get_rating(course_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/course_details/<course_name>')
-def course_details(course_name):
+@app.route('/api/course_details/<path:course_ref>')
+def course_details(course_ref):
+    """Details for a course given its id, link slug or name"""
     try:
-        # Find course in dataset
-        course = data[data['course_name'] == course_name].iloc[0]
-        
-        # Generate detailed rating information
-        if 'stars_distribution' in course and course['stars_distribution']:
-            stars = course['stars_distribution']
-        else:
-            stars = generate_realistic_ratings()['stars']
+        snapshot = current_catalog()
+        position = snapshot.find_course(course_ref)
+        if position is None:
+            return jsonify({'success': False, 'error': 'Course not found'}), 404
+        etag = etag_for(snapshot.version, rating_store.version(), position)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        course = snapshot.data.iloc[[position]][RESULT_COLUMNS].to_dict('records')[0]
         
-        total_reviews = sum(stars.values())
-        rating_percentages = {str(k): round((v / total_reviews) * 100, 1) for k, v in stars.items()}
+        stars, rating_percentages, total_reviews = rating_breakdown(course)
         
         course_details = {
             'name': course['course_name'],
-            'rating': course.get('rating', 4.5),
-            'reviews': course.get('reviews', total_reviews),
+            'rating': round(course['rating'], 1),
+            'reviews': course['reviews'],
             'stars_distribution': stars,
             'rating_percentages': rating_percentages,
             'total_reviews': total_reviews,
             'enrollment': course.get('enrollment', 0),
             'duration': course.get('time_required', 'Not specified'),
             'difficulty': course.get('difficulty', 'Not specified'),
-            'category': course.get('category', 'General')
+            'category': course.get('category', 'General'),
+            'skills': snapshot.index.skills.skills_for(position),
+            'course_id': course['course_id'],
+            'community_rating': rating_store.get_aggregates([course['course_id']])[course['course_id']]
         }
         
-        return jsonify({'success': True, 'course': course_details})
+        return with_etag(jsonify({'success': True, 'course': course_details}), etag)
         
     except Exception as e:
         logger.error(f"Error fetching course details: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/recommend/batch', methods=['POST'])
+def recommend_batch():
+    """Recommendations for a list of queries: {"queries": [{"topic": ..., ...}], "top_n": 8}"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        queries = payload.get('queries')
+        top_n = payload.get('top_n', 8)
+        if not isinstance(queries, list) or not all(isinstance(query, dict) for query in queries):
+            return jsonify({'success': False, 'error': 'queries must be a list of objects'}), 400
+        if len(queries) > app.config['BATCH_MAX_QUERIES']:
+            return jsonify({'success': False, 'error': f"At most {app.config['BATCH_MAX_QUERIES']} queries per request"}), 400
+        if isinstance(top_n, bool) or not isinstance(top_n, int) or not 1 <= top_n <= 100:
+            return jsonify({'success': False, 'error': 'top_n must be an integer between 1 and 100'}), 400
+        
+        results = scoring_executor.run(batch_recommendations, queries, top_n)
+        return jsonify({'success': True, 'results': results})
+        
+    except ScoringOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch recommendation: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/similar/<path:course_ref>')
+def similar_courses(course_ref):
+    """Courses most similar to the given one, from the precomputed neighbour table"""
+    try:
+        snapshot = current_catalog()
+        if snapshot.index.neighbors is None:
+            return jsonify({'success': False, 'error': 'Similar courses are disabled'}), 404
+        position = snapshot.find_course(course_ref)
+        if position is None:
+            return jsonify({'success': False, 'error': 'Course not found'}), 404
+        limit = request.args.get('limit', type=int) or snapshot.index.neighbors.k
+        etag = etag_for(snapshot.version, position, limit)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        similar = snapshot.index.neighbors.similar(position, max(limit, 1))
+        rows = snapshot.data.iloc[[neighbor for neighbor, _ in similar]]
+        return with_etag(jsonify({
+            'success': True,
+            'course_id': snapshot.data['course_id'].iat[position],
+            'similar': [
+                {'course_id': course_id, 'name': name, 'score': round(score, 3)}
+                for course_id, name, (_, score) in zip(rows['course_id'].tolist(), rows['course_name'].tolist(), similar)
+            ]
+        }), etag)
+        
+    except Exception as e:
+        logger.error(f"Error fetching similar courses: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/suggest')
+def suggest():
+    """Typeahead suggestions for the topic box: ?q=<prefix>&limit=8"""
+    try:
+        query = request.args.get('q', '')[:100]
+        limit = min(max(request.args.get('limit', 8, type=int), 1), 20)
+        return jsonify({'success': True, 'suggestions': current_catalog().suggestions.suggest(query, limit)})
+    except Exception as e:
+        logger.error(f"Error fetching suggestions: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/facets')
+def facets():
+    """Course counts per facet value under the filters in the query string"""
+    try:
+        snapshot = current_catalog()
+        selection = {facet: request.args.get(facet, 'Any') for facet in FACET_COLUMNS}
+        etag = etag_for(snapshot.version, sorted(selection.items()), request.args.get('time', 'Any'), request.args.get('skills', 'Any'))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        extra = np.ones(len(snapshot.data), dtype=bool)
+        if request.args.get('time', 'Any') != 'Any':
+            extra &= duration_mask(snapshot.data, request.args['time'])
+        if request.args.get('skills', 'Any') != 'Any':
+            extra &= snapshot.index.skill_mask(request.args['skills'])
+        
+        return with_etag(jsonify({
+            'success': True,
+            'total': int(POPCOUNT[snapshot.facets.combine(selection, extra)].sum()),
+            'facets': snapshot.facets.counts(selection, extra),
+            'options': snapshot.facets.option_counts(FACET_OPTIONS, selection, extra)
+        }), etag)
+        
+    except Exception as e:
+        logger.error(f"Error computing facets: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# Admin endpoints
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the catalog (CSV or ingested shards) into this worker; requires the ADMIN_TOKEN header"""
+    token = app.config['ADMIN_TOKEN']
+    if not token or not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        payload = request.get_json(silent=True) or {}
+        stats = reload_catalog(full=bool(payload.get('full', False)))
+        return jsonify({'success': True, 'reload': stats})
+    except Exception as e:
+        logger.error(f"Error reloading catalog: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Health check endpoint
 @app.route('/health')
 def health_check():
+    scoring = scoring_executor.stats()
+    snapshot = current_catalog()
     return jsonify({
-        'status': 'healthy',
+        'status': 'saturated' if scoring['in_flight'] >= scoring['queue_limit'] else 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'courses_count': len(data),
+        'courses_count': len(snapshot.data),
+        'catalog_version': snapshot.version,
+        'recommendation_cache': recommendation_cache.stats(),
+        'card_cache': card_cache.stats(),
+        'collaborative': co_ratings.stats(),
+        'scoring': scoring,
         'themes_available': list(THEMES.keys())
     })
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this worker's latency histograms and cache counters"""
+    lines = []
+
+    def histogram(name, help_text, label, histograms):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, hist in sorted(histograms.items()):
+            buckets, total, count = hist.snapshot()
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{{label}="{key}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label}="{key}"}} {total:.6f}')
+            lines.append(f'{name}_count{{{label}="{key}"}} {count}')
+
+    histogram('edurecommend_stage_duration_seconds', 'Time spent in each recommendation pipeline stage.', 'stage', dict(stage_latency))
+    histogram('edurecommend_request_duration_seconds', 'Request latency by endpoint.', 'endpoint', dict(request_latency))
+
+    cache_stats = recommendation_cache.stats()
+    scoring = scoring_executor.stats()
+    for name, metric_type, help_text, value in [
+        ('edurecommend_cache_hits_total', 'counter', 'Recommendation cache hits.', cache_stats['hits']),
+        ('edurecommend_cache_misses_total', 'counter', 'Recommendation cache misses.', cache_stats['misses']),
+        ('edurecommend_cache_coalesced_total', 'counter', 'Misses that waited on an identical in-flight query.', cache_stats['coalesced']),
+        ('edurecommend_cache_hit_ratio', 'gauge', 'Fraction of cache lookups that hit.', cache_stats['hit_rate']),
+        ('edurecommend_cache_entries', 'gauge', 'Rankings currently held in the cache.', cache_stats['size']),
+        ('edurecommend_catalog_courses', 'gauge', 'Courses in the loaded catalog.', len(current_catalog().data)),
+        ('edurecommend_scoring_in_flight', 'gauge', 'Scoring tasks running or queued.', scoring['in_flight']),
+        ('edurecommend_scoring_saturation', 'gauge', 'In-flight scoring tasks as a fraction of the queue limit.', scoring['saturation']),
+        ('edurecommend_scoring_rejected_total', 'counter', 'Requests shed with 503 because the scoring queue was full.', scoring['rejected']),
+        ('edurecommend_scoring_timeouts_total', 'counter', 'Requests answered with 503 because scoring timed out.', scoring['timeouts']),
+    ]:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def add_server_timing(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    request_latency[request.endpoint or 'unmatched'].observe(elapsed)
+    timings = g.get('stage_timings', []) + [('total', elapsed)]
+    response.headers['Server-Timing'] = ', '.join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings)
+    return response
+
 # Error handlers
+@app.errorhandler(ScoringOverloaded)
+def scoring_overloaded(error):
+    """Fast 503 while the scoring queue is full, telling clients when to come back"""
+    logger.warning(f"Shedding {request.path}: {error}")
+    if request.path.startswith('/api/'):
+        response = jsonify({'success': False, 'error': 'Server busy, please retry shortly'})
+    else:
+        response = Response('Too many recommendation requests right now, please retry in a moment.', mimetype='text/plain')
+    response.status_code = 503
+    response.headers['Retry-After'] = str(app.config['SCORING_RETRY_AFTER'])
+    return response
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('error.html', 
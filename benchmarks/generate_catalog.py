@@ -0,0 +1,115 @@
+"""Synthetic course catalog in the schema of Coursera_courses_catalog.csv.
+
+    python benchmarks/generate_catalog.py --rows 100000 --output /tmp/catalog_100k.csv
+
+The same rows and seed always produce the same file. Value formats follow the
+real CSV, including guided projects whose subtitle text sits in course_level.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+SUB_CATEGORIES = {
+    'Data Science': ['Data Analysis', 'Machine Learning', 'Probability and Statistics'],
+    'Computer Science': ['Software Development', 'Mobile and Web Development', 'Algorithms', 'Computer Security and Networks', 'Design and Product'],
+    'Business': ['Leadership and Management', 'Business Essentials', 'Finance', 'Marketing', 'Entrepreneurship', 'Business Strategy'],
+    'Information Technology': ['Cloud Computing', 'Data Management', 'Networking', 'Security', 'Support and Operations'],
+    'Health': ['Patient Care', 'Nutrition', 'Public Health', 'Healthcare Management', 'Psychology', 'Health Informatics'],
+    'Arts and Humanities': ['History', 'Music and Art', 'Philosophy'],
+    'Social Sciences': ['Economics', 'Education', 'Law', 'Governance and Society'],
+    'Physical Science and Engineering': ['Electrical Engineering', 'Mechanical Engineering', 'Physics and Astronomy', 'Chemistry'],
+    'Language Learning': ['Learning English', 'Other Languages'],
+    'Personal Development': ['Personal Development'],
+    'Math and Logic': ['Math and Logic']
+}
+SKILLS = {
+    'Data Science': ['Python Programming', 'Machine Learning', 'Data Analysis', 'Statistics', 'Deep Learning', 'Data Visualization', 'SQL', 'R Programming', 'Pandas', 'Regression Analysis', 'Natural Language Processing', 'Tableau'],
+    'Computer Science': ['Java', 'JavaScript', 'React', 'Node.js', 'HTML', 'CSS', 'Algorithms', 'Data Structures', 'Git', 'Software Testing', 'C++', 'Cryptography'],
+    'Business': ['Leadership', 'Marketing', 'Finance', 'Accounting', 'Negotiation', 'Project Management', 'Strategic Management', 'Excel', 'Business Analysis', 'Sales'],
+    'Information Technology': ['Cloud Computing', 'AWS', 'Google Cloud Platform', 'Linux', 'Networking', 'Cybersecurity', 'Kubernetes', 'Docker', 'Troubleshooting', 'Databases'],
+    'Health': ['Patient Care', 'Nutrition', 'Epidemiology', 'Public Health', 'Psychology', 'Anatomy', 'Clinical Research', 'Healthcare Management'],
+    'Arts and Humanities': ['Art History', 'Music Theory', 'Writing', 'Philosophy', 'Photography', 'Storytelling', 'Creative Writing'],
+    'Social Sciences': ['Economics', 'Public Policy', 'Law', 'Teaching', 'Sociology', 'International Relations', 'Game Theory'],
+    'Physical Science and Engineering': ['Physics', 'Chemistry', 'Electronics', 'Mechanics', 'Renewable Energy', 'Materials Science', 'Thermodynamics'],
+    'Language Learning': ['English Grammar', 'Spanish', 'Chinese', 'Pronunciation', 'Vocabulary', 'Business English'],
+    'Personal Development': ['Communication', 'Time Management', 'Career Development', 'Mindfulness', 'Public Speaking'],
+    'Math and Logic': ['Calculus', 'Linear Algebra', 'Probability', 'Discrete Mathematics', 'Logic']
+}
+PREFIXES = ['Introduction to', 'Foundations of', 'Applied', 'Advanced', 'Practical', 'Mastering', 'Getting Started with', 'Essentials of', '']
+SUFFIXES = ['', 'for Beginners', 'Specialization', 'Capstone Project', 'in Practice', 'for Professionals', 'with Python', 'Fundamentals']
+UNIVERSITIES = ['Coursera Project Network', 'Google Cloud', 'University of Illinois at Urbana-Champaign', 'University of Colorado Boulder',
+                'University of Pennsylvania', 'Johns Hopkins University', 'University of Michigan', 'Duke University',
+                'Universidad Nacional Autónoma de México', 'Saint Petersburg State University', 'IBM', 'Stanford University']
+LANGUAGES = ['English'] * 14 + ['Spanish'] * 2 + ['Russian', 'French', 'Portuguese (Brazilian)', 'Chinese (Simplified)', 'not-mentioned']
+SUBTITLES = ['Subtitles: English'] * 6 + ['Subtitles: French, Portuguese (Brazilian), Russian, English, Spanish'] * 2 + \
+            ['Subtitles: Spanish', 'Subtitles: Russian', 'Subtitles: Chinese (Simplified)', 'Subtitles: English, Spanish', 'not-mentioned']
+LEVELS = ['Beginner Level'] * 5 + ['Intermediate Level'] * 3 + ['Advanced Level', 'not-mentioned', 'not-mentioned', 'mixed/not-mentioned']
+PROJECT_DURATIONS = ['1 hour', '2 hours', '1 hour 30 minutes', 'one hour', '90 minutes', '2 hours 30 minutes']
+
+
+def generate_catalog(rows, seed=2024):
+    rng = np.random.default_rng(seed)
+    categories = list(SUB_CATEGORIES)
+    category = rng.choice(len(categories), rows, p=np.array([18, 16, 16, 10, 10, 7, 7, 6, 4, 3, 3]) / 100)
+    guided = rng.random(rows) < 0.15
+    skill_counts = rng.integers(0, 7, rows)
+    picks = rng.random((rows, 6))
+    hours = rng.integers(1, 120, rows)
+    sub_pick = rng.random(rows)
+    prefix = rng.integers(0, len(PREFIXES), rows)
+    suffix = rng.integers(0, len(SUFFIXES), rows)
+    university = rng.integers(0, len(UNIVERSITIES), rows)
+    language = rng.integers(0, len(LANGUAGES), rows)
+    subtitles = rng.integers(0, len(SUBTITLES), rows)
+    level = rng.integers(0, len(LEVELS), rows)
+    project_duration = rng.integers(0, len(PROJECT_DURATIONS), rows)
+    rated = rng.random(rows) < 0.6
+    rating = np.round(rng.uniform(3.5, 5.0, rows), 1)
+
+    records = []
+    for i in range(rows):
+        name_of_category = categories[category[i]]
+        pool = SKILLS[name_of_category]
+        skills = [pool[int(picks[i, j] * len(pool))] for j in range(skill_counts[i])]
+        skills = list(dict.fromkeys(skills))
+        topic = pool[int(picks[i, 0] * len(pool))]
+        name = ' '.join(part for part in (PREFIXES[prefix[i]], topic, SUFFIXES[suffix[i]]) if part)
+        subs = SUB_CATEGORIES[name_of_category]
+        university_name = UNIVERSITIES[university[i]]
+        if guided[i]:
+            # Guided projects: language in course_subtitles, subtitle text in course_level
+            time_required, course_subtitles, course_level = PROJECT_DURATIONS[project_duration[i]], 'English', SUBTITLES[subtitles[i]]
+            course_type, university_name = 'GUIDED PROJECT', 'Coursera Project Network'
+        else:
+            time_required, course_subtitles, course_level = f"Approx. {hours[i]} hours to complete", SUBTITLES[subtitles[i]], LEVELS[level[i]]
+            course_type = 'COURSE'
+        records.append({
+            'course_name': name,
+            'course_link': f"https://www.coursera.org/learn/{name.lower().replace(' ', '-')}-{i}",
+            'university_name': university_name,
+            'course_type': course_type,
+            'university_logo': f"https://d3njjcbhbojbot.cloudfront.net/api/utilities/v1/imageproxy/logos/{university[i]}.png?auto=format%2Ccompress&dpr=2&w=120&h=120",
+            'time_required': time_required,
+            'course_language': LANGUAGES[language[i]],
+            'course_subtitles': course_subtitles,
+            'course_skills': repr(skills),
+            'course_rating': f"{rating[i]}stars" if rated[i] else 'not-mentioned',
+            'category': name_of_category,
+            'sub_category': subs[int(sub_pick[i] * len(subs))],
+            'course_level': course_level
+        })
+    return pd.DataFrame.from_records(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+    # The real export carries a leading unnamed row-number column
+    generate_catalog(args.rows, args.seed).to_csv(args.output)
+
+
+if __name__ == '__main__':
+    main()
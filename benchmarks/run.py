@@ -0,0 +1,266 @@
+"""Benchmark the recommendation pipeline on synthetic catalogs.
+
+    python benchmarks/run.py --rows 5000 20000 100000 --output results.json
+    python benchmarks/run.py --rows 5000 --compare benchmarks/baseline.json
+    python benchmarks/run.py --app-dir ../pre-series --repeats 1 --output benchmarks/baseline_pre_series.json
+
+Each scale runs in its own process: the catalog is generated, the app is
+imported against it (the load is measured too) and every stage is timed
+directly and through the Flask test client. Latency percentiles, throughput
+and the peak traced allocation of each stage are written as JSON;
+``--compare`` flags stages whose p50 regressed against an earlier run.
+
+Each stage is timed ``--repeats`` times over the same inputs. The gate compares
+the fastest repeat's p50, which noise can only slow down, and widens the
+threshold by the spread between repeats measured in either run.
+
+``--app-dir`` times the app.py of another checkout instead, such as the one
+before the optimisation series. An app without a catalog snapshot is timed
+only on the entry points it shares with the current one.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_catalog import generate_catalog  # noqa: E402
+
+
+def max_rss_mb():
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def measure(function, inputs, repeats=5, warmup=3, memory_samples=5, items_per_op=1):
+    """Latency percentiles and throughput of ``function`` over ``inputs``, then its peak allocation.
+
+    Percentiles and throughput come from the median repeat; ``p50_min_ms`` is the
+    fastest repeat's p50 and ``p50_spread`` the slowest repeat's p50 over it.
+    """
+    for item in inputs[:warmup]:
+        function(item)
+    runs = []
+    for _ in range(repeats):
+        latencies = []
+        start = time.perf_counter()
+        for item in inputs:
+            begin = time.perf_counter()
+            function(item)
+            latencies.append(time.perf_counter() - begin)
+        runs.append((float(np.percentile(latencies, 50)), time.perf_counter() - start, latencies))
+    runs.sort(key=lambda run: run[0])
+    _, total, latencies = runs[len(runs) // 2]
+    # Allocations are traced in a separate pass so tracing does not skew the timings
+    tracemalloc.start()
+    for item in inputs[:memory_samples]:
+        function(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    latencies = np.array(latencies) * 1000
+    return {
+        'ops': len(inputs),
+        'repeats': repeats,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 4),
+        'p50_min_ms': round(runs[0][0] * 1000, 4),
+        'p50_spread': round(runs[-1][0] / max(runs[0][0], 1e-12), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 4),
+        'mean_ms': round(float(latencies.mean()), 4),
+        'throughput_per_s': round(len(inputs) * items_per_op / total, 1),
+        'peak_alloc_mb': round(peak / 2**20, 3)
+    }
+
+
+def make_queries(app, count, seed):
+    """Deterministic topics and filter combinations drawn from the form's options"""
+    rng = np.random.default_rng(seed)
+    topics = app.predefined_skills + app.predefined_categories + ['introduction', 'project management', 'neural networks', 'public health']
+    def pick(options, any_share):
+        return 'Any' if rng.random() < any_share else options[rng.integers(len(options))]
+    return [
+        (topics[rng.integers(len(topics))], pick(app.predefined_skills, 0.8), pick(app.predefined_categories, 0.6),
+         pick(app.predefined_difficulties, 0.6), pick(app.predefined_languages, 0.7), pick(app.predefined_durations, 0.7),
+         pick(app.predefined_subtitles, 0.8))
+        for _ in range(count)
+    ]
+
+
+def run_scale(args):
+    """Body of the per-scale worker process; prints the scale's results as JSON"""
+    sys.path.insert(0, args.app_dir)
+    os.environ.update({
+        'CATALOG_CSV': args.csv,
+        'CATALOG_INDEX_DIR': os.path.join(os.path.dirname(args.csv), 'no-index'),
+        'RATING_STORE': 'memory',
+        'RECOMMEND_CACHE_SIZE': '0',
+        'SIMILAR_COURSES_K': str(args.similar_k),
+        'RECOMMENDER_ENGINE': args.engine
+    })
+    start = time.perf_counter()
+    import app
+    results = {'load': {'seconds': round(time.perf_counter() - start, 3), 'max_rss_mb': round(max_rss_mb(), 1)}}
+
+    queries = make_queries(app, args.queries, args.seed)
+    forms = [dict(zip(['topic', 'skills', 'category', 'difficulty', 'language', 'time', 'subtitles'], query)) for query in queries]
+    prefixes = [query[0][:n] for query, n in zip(queries, np.random.default_rng(args.seed).integers(1, 6, len(queries)))]
+    batches = [[{'topic': query[0], 'category': query[2]} for query in queries[start:start + 100]]
+               for start in range(0, len(queries), 100)]
+    client = app.app.test_client()
+
+    if not hasattr(app, 'catalog'):
+        # The app before the optimisation series keeps one global frame and has no indexes. It also
+        # slept 0.5s in both functions for the loading animation, which the current app skips by
+        # default, so the delay is unwrapped (for the route too) to time the work alone
+        for name in ('filter_courses_by_preferences', 'recommend_courses'):
+            setattr(app, name, getattr(getattr(app, name), '__wrapped__', getattr(app, name)))
+
+        def filter_courses(query):
+            # Filters that leave no rows made it raise on the emptied frame (the route showed an error page)
+            try:
+                return app.filter_courses_by_preferences(app.data, query)
+            except KeyError:
+                return app.data.iloc[:0]
+
+        stages = {
+            'filter_courses': (filter_courses, queries, 1),
+            'recommend_courses': (lambda query: app.recommend_courses(query, filter_courses(query)), queries, 1),
+            'route_recommend': (lambda form: client.post('/recommend', data=form), forms, 1)
+        }
+        snapshot = None
+    else:
+        snapshot = app.catalog
+        stages = {
+            'filter': (lambda query: app.preference_mask(snapshot.data, query, snapshot.index, snapshot.facets), queries, 1),
+            'filter_courses': (lambda query: app.filter_courses_by_preferences(snapshot.data, query), queries, 1),
+            'rank': (lambda query: app.compute_ranking(snapshot, query, 8, 0), queries, 1),
+            'recommend_courses': (lambda query: app.recommend_courses(query, app.filter_courses_by_preferences(snapshot.data, query)), queries, 1),
+            'batch_recommendations': (lambda batch: app.batch_recommendations(batch, 8), batches, 100),
+            'suggest': (lambda prefix: snapshot.suggestions.suggest(prefix), prefixes, 1),
+            'route_recommend': (lambda form: client.post('/recommend', data=form), forms, 1),
+            'route_suggest': (lambda prefix: client.get('/api/suggest', query_string={'q': prefix}), prefixes, 1),
+            'route_facets': (lambda form: client.get('/api/facets', query_string=form), forms, 1)
+        }
+    if snapshot is not None and snapshot.index.neighbors is not None:
+        course_ids = snapshot.data['course_id'].to_numpy()[np.random.default_rng(args.seed).integers(0, len(snapshot.data), len(queries))]
+        stages['route_similar'] = (lambda course_id: client.get(f'/api/similar/{course_id}'), list(course_ids), 1)
+
+    for name, (function, inputs, items_per_op) in stages.items():
+        if args.stages and name not in args.stages:
+            continue
+        results[name] = measure(function, inputs, repeats=args.repeats, items_per_op=items_per_op)
+    results['process'] = {'max_rss_mb': round(max_rss_mb(), 1)}
+    print(json.dumps(results))
+
+
+def git_commit(directory):
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print best-repeat p50 ratios against a baseline run; returns the number of regressions"""
+    regressions = 0
+    for rows, stages in results['scales'].items():
+        for stage, stats in stages.items():
+            base = baseline.get('scales', {}).get(rows, {}).get(stage)
+            if not base or 'p50_ms' not in stats or 'p50_ms' not in base:
+                continue
+            current, previous = stats.get('p50_min_ms', stats['p50_ms']), base.get('p50_min_ms', base['p50_ms'])
+            ratio = current / max(previous, 1e-9)
+            # A stage whose repeats already disagree by more than the threshold needs that much slack
+            limit = threshold * max(stats.get('p50_spread', 1.0), base.get('p50_spread', 1.0))
+            # Sub-50us differences are timer noise, whatever the ratio
+            regressed = ratio > limit and current - previous > 0.05
+            regressions += regressed
+            print(f"{rows:>8} {stage:<22} p50 {previous:9.3f} -> {current:9.3f} ms  x{ratio:5.2f} (limit x{limit:4.2f})"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 20000, 100000])
+    parser.add_argument('--queries', type=int, default=300, help='Queries per stage.')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed passes over the queries per stage.')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--engine', default='tfidf', choices=['tfidf', 'lsa'])
+    parser.add_argument('--similar-k', type=int, default=10)
+    parser.add_argument('--similar-max-rows', type=int, default=20000,
+                        help='Build the all-pairs similar-courses table only up to this catalog size.')
+    parser.add_argument('--stages', nargs='*', help='Only run these stages.')
+    parser.add_argument('--output', help='Write the results JSON here.')
+    parser.add_argument('--compare', help='Baseline JSON to check for p50 regressions.')
+    parser.add_argument('--threshold', type=float, default=1.25, help='p50 ratio counted as a regression.')
+    parser.add_argument('--app-dir', default=ROOT, help='Checkout whose app.py is benchmarked (defaults to this one).')
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.app_dir = os.path.abspath(args.app_dir)
+
+    if args.csv:
+        run_scale(args)
+        return
+
+    results = {
+        'meta': {
+            'commit': git_commit(args.app_dir),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'engine': args.engine,
+            'queries': args.queries,
+            'repeats': args.repeats,
+            'seed': args.seed
+        },
+        'scales': {}
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            # Named as the pre-series app expects to find it in its working directory
+            scale_dir = os.path.join(workdir, str(rows))
+            os.makedirs(scale_dir)
+            csv_path = os.path.join(scale_dir, 'Coursera_courses_catalog.csv')
+            generate_catalog(rows, args.seed).to_csv(csv_path)
+            similar_k = args.similar_k if rows <= args.similar_max_rows else 0
+            command = [sys.executable, os.path.abspath(__file__), '--csv', csv_path, '--queries', str(args.queries),
+                       '--repeats', str(args.repeats), '--seed', str(args.seed), '--engine', args.engine,
+                       '--similar-k', str(similar_k), '--app-dir', args.app_dir]
+            if args.stages:
+                command += ['--stages', *args.stages]
+            completed = subprocess.run(command, cwd=scale_dir, capture_output=True, text=True)
+            if completed.returncode != 0:
+                sys.exit(f"Benchmark at {rows} rows failed:\n{completed.stderr[-2000:]}")
+            results['scales'][str(rows)] = json.loads(completed.stdout.strip().splitlines()[-1])
+            scale = results['scales'][str(rows)]
+            print(f"{rows} rows: load {scale['load']['seconds']}s, peak RSS {scale['process']['max_rss_mb']} MB")
+            for stage, stats in scale.items():
+                if 'p50_ms' in stats:
+                    print(f"  {stage:<22} p50 {stats['p50_ms']:9.3f}  p95 {stats['p95_ms']:9.3f}  p99 {stats['p99_ms']:9.3f} ms"
+                          f"  spread x{stats['p50_spread']:4.2f}  {stats['throughput_per_s']:>10}/s  peak {stats['peak_alloc_mb']} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"{regressions} stage(s) regressed by more than x{args.threshold}")
+
+
+if __name__ == '__main__':
+    main()
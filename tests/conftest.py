@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The app loads its catalog and rating store at import time; keep both in-process for tests
+os.environ.setdefault('RATING_STORE', 'memory')
+os.environ.setdefault('CATALOG_WATCH_INTERVAL', '0')
+os.environ.setdefault('CATALOG_INDEX_DIR', os.path.join(os.path.dirname(__file__), 'no-index'))
+os.environ.setdefault('CATALOG_SHARDS_DIR', '')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
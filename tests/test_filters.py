@@ -0,0 +1,63 @@
+"""Precomputed filter columns and indexes against scans of the catalog rows."""
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('text, hours', [
+    ('Approx. 14 hours to complete', (14.0, 14.0)),
+    ('Approximately 2 hours', (2.0, 2.0)),
+    ('2 hours 30 minutes', (2.5, 2.5)),
+    ('1-3 hours', (1.0, 3.0)),
+    ('16+ hours', (16.0, float('inf'))),
+    ('three weeks', (15, 30)),
+    ('not-mentioned', (0, 0)),
+    (None, (0, 0)),
+])
+def test_convert_time_to_hours(text, hours):
+    assert app.convert_time_to_hours(text) == hours
+
+
+def test_duration_columns_match_the_parsed_text():
+    data = app.catalog.data
+    parsed = [app.convert_time_to_hours(text) for text in data['time_required'].astype(object).tolist()]
+    # Unknown durations are stored as NaN so they never match a duration filter
+    parsed = [(np.nan, np.nan) if hours == (0, 0) else hours for hours in parsed]
+    np.testing.assert_allclose(data['duration_min_hours'], [low for low, _ in parsed], rtol=1e-6)
+    np.testing.assert_allclose(data['duration_max_hours'], [high for _, high in parsed], rtol=1e-6)
+
+
+def test_preference_mask_matches_a_row_scan():
+    data = app.catalog.data
+    raw = app.pd.read_csv(app.app.config['CATALOG_CSV']).dropna(subset=['course_name', 'course_link'])
+    skills = [app.parse_skills(value) for value in raw['course_skills'].fillna('[]').tolist()]
+    for category, difficulty, time, skill in [('Data Science', 'Any', 'Any', 'Any'), ('Any', 'Beginner', '4-6 hours', 'Any'),
+                                              ('Business', 'Any', 'Any', 'leadership'), ('Any', 'Any', '16+ hours', 'Python')]:
+        user_input = ('', skill, category, difficulty, 'Any', time, 'Any')
+        expected = np.ones(len(data), dtype=bool)
+        if category != 'Any':
+            expected &= data['category'].astype(str).str.contains(category, case=False, regex=False).to_numpy()
+        if difficulty != 'Any':
+            expected &= data['difficulty'].astype(str).str.contains(difficulty, case=False, regex=False).to_numpy()
+        if time != 'Any':
+            low, high = app.convert_time_to_hours(time)
+            expected &= ((data['duration_max_hours'] >= low) & (data['duration_min_hours'] <= high)).to_numpy()
+        if skill != 'Any':
+            expected &= np.array([any(skill.lower() in name.lower() for name in names) for names in skills])
+        assert expected.any()
+        assert np.array_equal(app.preference_mask(data, user_input), expected)
+
+
+def test_facet_option_counts_equal_the_filtered_results():
+    data = app.catalog.data
+    client = app.app.test_client()
+    filters = {'category': 'Data Science', 'difficulty': 'Any', 'language': 'English', 'subtitles': 'Any', 'time': '4-6 hours'}
+    options = client.get('/api/facets', query_string=filters).get_json()['options']
+    for facet, names in app.FACET_OPTIONS.items():
+        for name in names:
+            selected = dict(filters, **{facet: name})
+            user_input = ('', 'Any', selected['category'], selected['difficulty'], selected['language'], selected['time'], selected['subtitles'])
+            # Each option counts what choosing it would return, with the other filters kept
+            assert options[facet][name] == int(app.preference_mask(data, user_input).sum()), (facet, name)
+    assert any(options['subtitles'].values())
@@ -0,0 +1,135 @@
+"""Incremental code paths checked against a full recompute of the same state."""
+import random
+
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random, vstack
+from sklearn.preprocessing import normalize
+
+import app
+
+
+def assert_same_neighbors(table, expected):
+    """Equal scores everywhere; equal ids except where tied scores make the order arbitrary"""
+    assert np.array_equal(table.scores, expected.scores)
+    for row in range(len(expected.ids)):
+        scores = expected.scores[row]
+        for score in np.unique(scores):
+            tied = scores == score
+            if score == scores[-1] and tied.sum() < len(scores):
+                continue  # ties at the cut-off may keep either course
+            assert set(table.ids[row][tied]) == set(expected.ids[row][tied])
+
+
+def test_neighbor_table_update_matches_rebuild():
+    rng = np.random.default_rng(7)
+    old = normalize(sparse_random(300, 60, density=0.08, format='csr', random_state=1))
+    old_table = app.NeighborTable.build(old, 5)
+
+    # Drop 20 courses, change 10 and append 15
+    kept = np.setdiff1d(np.arange(300), rng.choice(300, 20, replace=False))
+    changed = rng.choice(len(kept), 10, replace=False)
+    rows = old[kept].tolil()
+    for position in changed:
+        rows[position] = normalize(sparse_random(1, 60, density=0.1, format='csr', random_state=int(position)))
+    added = normalize(sparse_random(15, 60, density=0.08, format='csr', random_state=2))
+    new = vstack([rows.tocsr(), added]).tocsr()
+
+    old_to_new = np.full(300, -1, dtype=np.int64)
+    unchanged = np.setdiff1d(np.arange(len(kept)), changed)
+    old_to_new[kept[unchanged]] = unchanged
+    fresh = np.concatenate([np.sort(changed), np.arange(len(kept), new.shape[0])])
+
+    updated = old_table.update(new, old_to_new, fresh)
+    assert_same_neighbors(updated, app.NeighborTable.build(new, 5))
+
+
+@pytest.fixture
+def small_catalog(monkeypatch):
+    monkeypatch.setitem(app.app.config, 'CATALOG_REBUILD_FRACTION', 1.0)
+    raw = app.pd.read_csv(app.app.config['CATALOG_CSV']).dropna(subset=['course_name', 'course_link'])
+    return raw.iloc[:600].reset_index(drop=True), raw.iloc[600:620].reset_index(drop=True)
+
+
+def test_update_catalog_matches_full_rebuild(small_catalog):
+    base, extra = small_catalog
+    snapshot = app.CatalogSnapshot(*app.prepare_catalog(app.clean_catalog(base.copy())))
+
+    # Edit the source rows, as a re-exported CSV would, so row hashes pick up the changes
+    edited = base.drop(index=range(100, 110)).reset_index(drop=True)
+    edited.loc[200:209, 'course_name'] = edited.loc[200:209, 'course_name'] + ' Revised'
+    new_data = app.clean_catalog(app.pd.concat([edited, extra], ignore_index=True))
+
+    updated, stats = app.update_catalog(snapshot, new_data)
+    assert stats['mode'] == 'incremental'
+    assert (stats['added'], stats['changed'], stats['removed']) == (20, 10, 10)
+    full = app.CatalogSnapshot(*app.prepare_catalog(new_data))
+
+    # The incremental index keeps the old vocabulary, so only the rows are comparable with the rebuild
+    assert updated.version != snapshot.version
+    assert updated.version == app.compute_catalog_version(full.data, updated.index)
+    assert updated.data['course_id'].tolist() == full.data['course_id'].tolist()
+    for col in ['course_name', 'category', 'difficulty', 'subtitle_languages', 'rating', 'enrollment']:
+        assert updated.data[col].astype(object).tolist() == full.data[col].astype(object).tolist()
+    for position in range(len(full.data)):
+        assert updated.index.skills.skills_for(position) == full.index.skills.skills_for(position)
+    for selection in [{'category': 'Data Science'}, {'language': 'English', 'difficulty': 'Beginner'}, {'subtitles': 'Spanish'}]:
+        assert np.array_equal(updated.facets.mask(selection), full.facets.mask(selection))
+
+    # The incremental index keeps the old vocabulary; its rows must equal a fresh transform with it
+    prepared = app.ensure_unique_course_ids(app.prepare_filter_columns(new_data.copy()))
+    features = app.build_course_features(prepared, app.SkillTable.parse(prepared['course_skills']))
+    expected = snapshot.index.vectorizer.transform(features)
+    assert abs(updated.index.matrix - expected).max() < 1e-6
+    assert_same_neighbors(updated.index.neighbors, app.NeighborTable.build(updated.index.matrix, updated.index.neighbors.k))
+
+
+def brute_force_neighbors(ratings, courses, k):
+    """Top-k positive cosine neighbours from the dense user x course matrix of centred ratings"""
+    users = sorted({user for user, _ in ratings})
+    matrix = np.zeros((len(users), len(courses)))
+    for (user, course), rating in ratings.items():
+        matrix[users.index(user), courses.index(course)] = rating - 3
+    dots = matrix.T @ matrix
+    norms = np.sqrt(np.diag(dots))
+    similarities = dots / np.maximum(np.outer(norms, norms), 1e-12)
+    neighbors = {}
+    for i, course in enumerate(courses):
+        pairs = [(similarities[i, j], other) for j, other in enumerate(courses) if j != i and similarities[i, j] > 1e-12]
+        neighbors[course] = sorted(pairs, key=app.neighbor_order)[:k]
+    return neighbors
+
+
+def test_co_rating_index_matches_brute_force():
+    rng = random.Random(3)
+    courses = [f'c{i}' for i in range(25)]
+    users = [f'u{i}' for i in range(30)]
+    index = app.CoRatingIndex(k=5)
+    ratings = {}
+    # Re-ratings included: a user's later rating of a course replaces the earlier one
+    for _ in range(1500):
+        user, course, rating = rng.choice(users), rng.choice(courses[:rng.randint(3, 25)]), rng.randint(1, 5)
+        index.add(user, course, rating)
+        ratings[(user, course)] = rating
+
+    expected = brute_force_neighbors(ratings, courses, 5)
+    for course in courses:
+        got = index.neighbors(course)
+        assert [other for other, _ in got] == [other for _, other in expected[course]]
+        assert np.allclose([similarity for _, similarity in got], [similarity for similarity, _ in expected[course]])
+
+
+def test_co_rating_index_sync_applies_only_new_ratings():
+    store = app.MemoryRatingStore()
+    direct = app.CoRatingIndex(k=5)
+    synced = app.CoRatingIndex(k=5)
+    rng = random.Random(5)
+    for batch in range(3):
+        for _ in range(200):
+            user, course, rating = f'u{rng.randint(0, 15)}', f'c{rng.randint(0, 12)}', rng.randint(1, 5)
+            store.add_rating(user, course, rating)
+            direct.add(user, course, rating)
+        assert synced.sync(store) == store.version()
+        assert synced._rows == direct._rows
+        assert synced._neighbors == direct._neighbors
+    assert store.ratings_since(synced.version) == (synced.version, [])
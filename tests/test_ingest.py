@@ -0,0 +1,80 @@
+"""Streaming ingest and serving the ingested shards."""
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def served_shards(tmp_path, monkeypatch):
+    """Ingest 300 CSV rows into temporary shards and serve them, restoring the real catalog afterwards"""
+    source = tmp_path / 'catalog.csv'
+    app.pd.read_csv(app.app.config['CATALOG_CSV']).iloc[:300].to_csv(source, index=False)
+    shards = tmp_path / 'shards'
+    monkeypatch.setitem(app.app.config, 'CATALOG_SHARDS_DIR', str(shards))
+    app.ingest_catalog([str(source)], str(shards), chunk_size=120)
+    original, original_mtime = app.catalog, app.catalog_mtime
+    app.publish_catalog(app.CatalogSnapshot(*app.load_catalog_shards(str(shards))))
+    yield source, shards
+    app.publish_catalog(original)
+    app.catalog_mtime = original_mtime
+
+
+def test_reingest_changing_level_and_skills_is_published(served_shards):
+    source, shards = served_shards
+    assert app.serving_shards()
+    course_id = app.catalog.data['course_id'].iat[5]
+    client = app.app.test_client()
+    before = client.get(f'/api/course_details/{course_id}')
+
+    raw = app.pd.read_csv(source)
+    raw.loc[5, 'course_level'] = 'Advanced level'
+    raw.loc[5, 'course_skills'] = "['Quantum Knitting']"
+    raw.to_csv(source, index=False)
+    app.ingest_catalog([str(source)], str(shards), chunk_size=120)
+    stats = app.reload_catalog()
+    assert (stats['mode'], stats['changed']) == ('shards', True)
+
+    after = client.get(f'/api/course_details/{course_id}', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.get_json()['course']['difficulty'] == 'Advanced'
+    assert after.get_json()['course']['skills'] == ['Quantum Knitting']
+
+    # Re-ingesting the same rows leaves the served catalog alone
+    app.ingest_catalog([str(source)], str(shards), chunk_size=120)
+    assert app.reload_catalog()['changed'] is False
+
+
+def test_reingest_swaps_a_symlink_and_keeps_one_previous_generation(served_shards):
+    source, shards = served_shards
+    generations = lambda: sorted(path.name for path in shards.parent.iterdir() if path.name.startswith('shards.'))
+    assert shards.is_symlink() and generations() == [os.readlink(shards)]
+    for _ in range(3):
+        previous = os.readlink(shards)
+        app.ingest_catalog([str(source)], str(shards), chunk_size=120)
+        assert generations() == sorted([previous, os.readlink(shards)])
+    assert app.load_catalog_shards(str(shards))[0]['course_id'].tolist() == app.catalog.data['course_id'].tolist()
+
+
+def test_reingest_replaces_an_unversioned_shard_directory(served_shards):
+    source, shards = served_shards
+    legacy = shards.parent / 'legacy'
+    shutil.copytree(shards, legacy)
+    app.ingest_catalog([str(source)], str(legacy), chunk_size=120)
+    assert legacy.is_symlink()
+    assert len([path for path in shards.parent.iterdir() if path.name.startswith('legacy.')]) == 2
+
+
+def test_cli_commands_do_not_load_the_served_catalog(served_shards, tmp_path):
+    source, shards = served_shards
+    env = dict(os.environ, CATALOG_SHARDS_DIR=str(shards), FLASK_APP='app')
+    result = subprocess.run([sys.executable, '-m', 'flask', 'ingest', str(source), '--output', str(tmp_path / 'out')],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert 'Ingested 300 courses' in result.stdout
+    assert 'Course index ready' not in result.stderr
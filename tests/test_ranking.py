@@ -0,0 +1,47 @@
+"""Ranking paths checked against each other."""
+import numpy as np
+
+import app
+
+
+QUERIES = [
+    {'topic': 'machine learning'},
+    {'topic': 'python data analysis', 'skills': 'Python'},
+    {'topic': 'marketing strategy', 'category': 'Business', 'difficulty': 'Beginner'},
+    {'topic': 'public health', 'time': '11-15 hours', 'language': 'English'},
+    {'topic': 'web development', 'subtitles': 'Spanish'},
+    {'topic': 'zzzz no such topic'},
+]
+
+
+def single_query_input(query):
+    return (query['topic'], query.get('skills', 'Any'), query.get('category', 'Any'), query.get('difficulty', 'Any'),
+            query.get('language', 'Any'), query.get('time', 'Any'), query.get('subtitles', 'Any'))
+
+
+def test_batch_results_equal_single_query_rankings(monkeypatch):
+    # Small blocks so the batch is scored over several matrix products
+    monkeypatch.setitem(app.app.config, 'BATCH_SCORE_CELLS', 2 * len(app.catalog.data))
+    snapshot = app.catalog
+    batch = app.batch_rank(snapshot, [single_query_input(query) for query in QUERIES], top_n=10)
+    for query, ranked in zip(QUERIES, batch):
+        single = app.compute_ranking(snapshot, single_query_input(query), 10, 0)
+        assert [position for position, _ in ranked] == [position for position, _ in single]
+        assert np.allclose([score for _, score in ranked], [score for _, score in single])
+
+    client = app.app.test_client()
+    results = client.post('/api/recommend/batch', json={'queries': QUERIES, 'top_n': 10}).get_json()['results']
+    course_ids = snapshot.data['course_id'].tolist()
+    assert [result['course_ids'] for result in results] == [[course_ids[position] for position, _ in ranked] for ranked in batch]
+
+
+def test_top_k_indices_matches_a_stable_full_sort():
+    rng = np.random.default_rng(11)
+    cases = [rng.random(500), np.zeros(500), rng.integers(0, 4, 500).astype(float), np.zeros(0)]
+    sparse = np.zeros(100_000)
+    sparse[rng.choice(len(sparse), 3, replace=False)] = rng.random(3)
+    cases.append(sparse)
+    for scores in cases:
+        expected = np.lexsort((np.arange(len(scores)), -scores))
+        for k in (0, 1, 3, 8, 50, len(scores), len(scores) + 5):
+            assert app.top_k_indices(scores, k).tolist() == expected[:k].tolist()
@@ -0,0 +1,58 @@
+"""SQLite rating store behaviour that several workers depend on."""
+import sqlite3
+
+import app
+
+
+def test_failed_flush_keeps_the_batch(tmp_path):
+    path = str(tmp_path / 'ratings.db')
+    store = app.SQLiteRatingStore(path, flush_interval=0)
+    store._conn.execute("PRAGMA busy_timeout = 50")
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    store.add_rating('user', 'course', 4)
+    try:
+        store.flush()
+    except sqlite3.OperationalError:
+        pass
+    assert store.get_user_rating('user', 'course') == 4
+    other.execute("ROLLBACK")
+
+    store.flush()
+    assert store.get_aggregates(['course'])['course']['count'] == 1
+    store.close()
+
+
+def test_flushed_ratings_reach_other_workers(tmp_path):
+    path = str(tmp_path / 'ratings.db')
+    first = app.SQLiteRatingStore(path, flush_interval=0)
+    second = app.SQLiteRatingStore(path, flush_interval=0)
+    first.add_rating('a', 'x', 5)
+    first.add_rating('b', 'x', 3)
+    first.add_rating('a', 'x', 4)  # a re-rating replaces the earlier one in the aggregate
+    first.flush()
+    assert second.get_user_rating('a', 'x') == 4
+    assert second.get_aggregates(['x', 'y']) == first.get_aggregates(['x', 'y'])
+    assert second.get_aggregates(['x'])['x']['count'] == 2
+    first.close()
+    second.close()
+
+
+def test_workers_see_each_others_ratings_by_version(tmp_path):
+    path = str(tmp_path / 'ratings.db')
+    first = app.SQLiteRatingStore(path, flush_interval=0)
+    second = app.SQLiteRatingStore(path, flush_interval=0)
+    first.add_rating('a', 'x', 5)
+    first.flush()
+    version, rows = second.ratings_since(-1)
+    assert rows == [('a', 'x', 5)]
+
+    second.add_rating('a', 'x', 2)
+    second.add_rating('b', 'y', 4)
+    second.flush()
+    newer, rows = first.ratings_since(version)
+    assert newer == version + 1
+    assert sorted(rows) == [('a', 'x', 2), ('b', 'y', 4)]
+    assert first.ratings_since(newer) == (newer, [])
+    first.close()
+    second.close()
@@ -0,0 +1,47 @@
+"""ResultCache eviction, expiry and invalidation, and single-flight misses."""
+import threading
+import time
+
+import app
+
+
+def test_result_cache_eviction_expiry_and_clear():
+    cache = app.ResultCache(maxsize=2, ttl=60)
+    for key in 'abc':
+        cache.get_or_compute(key, lambda key=key: key)
+    assert list(cache._entries) == ['b', 'c']
+
+    cache.ttl = 0
+    cache.get_or_compute('d', lambda: 'd')
+    assert cache.get_or_compute('d', lambda: 'fresh') == 'fresh'
+
+    # A value computed against a catalog cleared meanwhile is returned but not kept
+    cache.ttl = 60
+    cache.get_or_compute('e', lambda: cache.clear() or 'stale')
+    assert 'e' not in cache._entries
+
+
+def test_result_cache_single_flight():
+    cache = app.ResultCache(maxsize=4, ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Hold the computation until every caller has missed and is waiting on it
+    deadline = time.monotonic() + 5
+    while cache.stats()['misses'] < 5 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 5
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 4
@@ -0,0 +1,105 @@
+"""HTTP behaviour of the routes: load shedding and conditional GETs."""
+import threading
+
+import pytest
+
+import app
+
+
+def test_full_scoring_queue_answers_503_with_retry_after(monkeypatch):
+    executor = app.ScoringExecutor(workers=1, queue_limit=1, timeout=5)
+    monkeypatch.setattr(app, 'scoring_executor', executor)
+    started, release = threading.Event(), threading.Event()
+
+    def occupy():
+        started.set()
+        release.wait(5)
+
+    holder = threading.Thread(target=executor.run, args=(occupy,))
+    holder.start()
+    started.wait(5)
+    try:
+        client = app.app.test_client()
+        page = client.get('/recommend', query_string={'topic': 'shed this page'})
+        batch = client.post('/api/recommend/batch', json={'queries': [{'topic': 'shed this batch'}]})
+    finally:
+        release.set()
+        holder.join()
+
+    for response in (page, batch):
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(app.app.config['SCORING_RETRY_AFTER'])
+    assert batch.get_json()['success'] is False
+    assert executor.stats()['rejected'] == 2
+    # Once the slot is free the same page is served
+    assert client.get('/recommend', query_string={'topic': 'shed this page'}).status_code == 200
+
+
+def revalidate(client, url, **kwargs):
+    """First response, and the status of a repeat request sending its ETag back"""
+    first = client.get(url, **kwargs)
+    assert first.status_code == 200 and first.headers['ETag']
+    repeat = client.get(url, headers={'If-None-Match': first.headers['ETag']}, **kwargs)
+    return first, repeat
+
+
+def test_unchanged_responses_revalidate_with_304():
+    client = app.app.test_client()
+    course_id = app.catalog.data['course_id'].iat[0]
+    for url, query in [('/recommend', {'topic': 'data science'}), (f'/api/course_details/{course_id}', None),
+                       (f'/api/similar/{course_id}', None), ('/api/facets', {'category': 'Business'})]:
+        first, repeat = revalidate(client, url, query_string=query)
+        assert repeat.status_code == 304, url
+        assert repeat.data == b''
+        assert repeat.headers['ETag'] == first.headers['ETag']
+
+    # A different theme renders a different page
+    first, _ = revalidate(client, '/recommend', query_string={'topic': 'data science'})
+    themed = client.get('/recommend', query_string={'topic': 'data science', 'theme': 'purple'},
+                        headers={'If-None-Match': first.headers['ETag']})
+    assert themed.status_code == 200
+
+
+def test_new_rating_changes_the_course_etag():
+    client = app.app.test_client()
+    course_id = app.catalog.data['course_id'].iat[1]
+    first, _ = revalidate(client, f'/api/course_details/{course_id}')
+    assert client.post('/api/rate_course', json={'course_id': course_id, 'rating': 5}).get_json()['success']
+    after = client.get(f'/api/course_details/{course_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert after.status_code == 200
+    assert after.get_json()['course']['community_rating']['count'] == 1
+
+
+@pytest.fixture
+def small_served_catalog(tmp_path, monkeypatch):
+    """Serve the first 300 CSV rows from a temporary file, restoring the real catalog afterwards"""
+    path = tmp_path / 'catalog.csv'
+    app.pd.read_csv(app.app.config['CATALOG_CSV']).iloc[:300].to_csv(path, index=False)
+    monkeypatch.setitem(app.app.config, 'CATALOG_CSV', str(path))
+    original, original_mtime = app.catalog, app.catalog_mtime
+    app.publish_catalog(app.CatalogSnapshot(*app.prepare_catalog(app.load_catalog_csv(str(path)))))
+    yield path
+    app.publish_catalog(original)
+    app.catalog_mtime = original_mtime
+
+
+@pytest.mark.parametrize('column, value, field, shown', [('course_level', 'Advanced level', 'difficulty', 'Advanced'),
+                                                       ('course_skills', "['Quantum Knitting']", 'skills', ['Quantum Knitting'])])
+def test_reload_changing_one_field_changes_the_etags(small_served_catalog, column, value, field, shown):
+    client = app.app.test_client()
+    course_id = app.catalog.data['course_id'].iat[5]
+    urls = [(f'/api/course_details/{course_id}', None), (f'/api/similar/{course_id}', None),
+            ('/recommend', {'topic': str(app.catalog.data['course_name'].iat[5])})]
+    etags = [revalidate(client, url, query_string=query)[0].headers['ETag'] for url, query in urls]
+
+    raw = app.pd.read_csv(small_served_catalog)
+    raw.loc[5, column] = value
+    raw.to_csv(small_served_catalog, index=False)
+    stats = app.reload_catalog()
+    assert (stats['mode'], stats['changed']) == ('incremental', 1)
+
+    for (url, query), etag in zip(urls, etags):
+        response = client.get(url, query_string=query, headers={'If-None-Match': etag})
+        assert response.status_code == 200, url
+        assert response.headers['ETag'] != etag
+    assert client.get(f'/api/course_details/{course_id}').get_json()['course'][field] == shown